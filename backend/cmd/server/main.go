@@ -31,6 +31,7 @@ import (
 func main() {
 	logger := server.SetupLogger(os.Getenv("LOG_LEVEL"))
 	slog.SetDefault(logger)
+	server.TuneRuntime(logger)
 
 	ctx, cancel := context.WithCancel(context.Background())
 	defer cancel()
@@ -66,6 +67,7 @@ func main() {
 	sseHub := sse.NewHub(logger)
 	pgListener := sse.NewPGListener(database.Pool, sseHub, logger)
 	limiter := ratelimit.New()
+	siteOwners := handlers.NewOwnerCache() // shared by every site-scoped handler
 
 	// Classification pipeline
 	pipeline := classify.NewPipeline(database, logger)
@@ -86,19 +88,20 @@ func main() {
 	var repoHandler *handlers.RepoHandler
 	if tokenEnc != nil {
 		scanner = repo.NewScanner(database, tokenEnc, logger)
-		repoHandler = handlers.NewRepoHandler(database, scanner, logger)
+		repoHandler = handlers.NewRepoHandler(database, scanner, siteOwners, logger)
 	}
 
 	// Agent loop (scanner is nil when token encryption not configured)
 	agentLoop := agents.NewLoop(database, pipeline, wsManager, logger, memClient, scanner)
 
-	// Proxy handler
-	proxyHandler := proxy.NewHandler(database, pipeline, sseHub, limiter, logger)
+	// Proxy handler (request_log rows are written behind in batches)
+	requestLogs := db.NewRequestLogWriter(database, logger)
+	proxyHandler := proxy.NewHandler(database, pipeline, sseHub, limiter, requestLogs, logger)
 
 	// HTTP handlers
-	siteHandler := handlers.NewSiteHandler(database, dnsVerifier, logger)
-	streamHandler := handlers.NewStreamHandler(sseHub, database)
-	dashHandler := handlers.NewDashboardHandler(database, logger)
+	siteHandler := handlers.NewSiteHandler(database, dnsVerifier, siteOwners, logger)
+	streamHandler := handlers.NewStreamHandler(sseHub, database, siteOwners)
+	dashHandler := handlers.NewDashboardHandler(database, siteOwners, logger)
 	compatHandler := handlers.NewCompatHandler(database, pipeline, proxyHandler, agentLoop, limiter, logger)
 
 	// Build router
@@ -234,7 +237,17 @@ func main() {
 	// Start background goroutines
 	go server.RunWithRecovery(ctx, logger, "dns-verifier", dnsVerifier.VerificationLoop)
 	go server.RunWithRecovery(ctx, logger, "session-cleanup", sm.CleanupLoop)
+	go server.RunWithRecovery(ctx, logger, "ratelimit-cleanup", limiter.CleanupLoop)
 	go server.RunWithRecovery(ctx, logger, "pg-listener", pgListener.Listen)
+	// The request log writer outlives ctx: it is stopped only after the HTTP
+	// server has drained, so rows queued by the last requests are still
+	// written, and main waits for its final flush before closing the pool.
+	writerCtx, stopWriter := context.WithCancel(context.Background())
+	writerDone := make(chan struct{})
+	go func() {
+		defer close(writerDone)
+		server.RunWithRecovery(writerCtx, logger, "request-log-writer", requestLogs.Run)
+	}()
 	go server.RunWithRecovery(ctx, logger, "agent-loop", func(ctx context.Context) {
 		agentLoop.Run(ctx)
 	})
@@ -251,10 +264,16 @@ func main() {
 		ReadTimeout:  15 * time.Second,
 		WriteTimeout: 0, // SSE + WebSocket need unlimited write time
 		IdleTimeout:  60 * time.Second,
+		// Every proxied request's headers are scanned by the regex stage
+		// several times over. Go's regexp is linear-time, but linear in 1MB
+		// (the default) is still a lot of CPU for one crafted request.
+		MaxHeaderBytes: 64 << 10,
 	}
 
 	// Graceful shutdown
+	shutdownDone := make(chan struct{})
 	go func() {
+		defer close(shutdownDone)
 		sigCh := make(chan os.Signal, 1)
 		signal.Notify(sigCh, syscall.SIGINT, syscall.SIGTERM)
 		<-sigCh
@@ -266,6 +285,8 @@ func main() {
 		if err := srv.Shutdown(shutdownCtx); err != nil {
 			logger.Error("server shutdown failed", "err", err)
 		}
+		// Handlers have drained; flush what they queued and stop the writer.
+		stopWriter()
 	}()
 
 	logger.Info("server starting", "port", port)
@@ -273,6 +294,10 @@ func main() {
 		logger.Error("server failed", "err", err)
 		os.Exit(1)
 	}
+	// ListenAndServe returns as soon as Shutdown starts; wait for the drain
+	// and the writer's final flush before the deferred database.Close.
+	<-shutdownDone
+	<-writerDone
 	logger.Info("server stopped")
 }
 
@@ -17,6 +17,9 @@ import (
 	"github.com/veil-waf/veil-go/internal/ws"
 )
 
+// cycleInterval is the pause between background agent cycles.
+const cycleInterval = 30 * time.Second
+
 // Loop manages the background Peek → Poke → Patch agent cycle.
 type Loop struct {
 	db       *db.DB
@@ -25,8 +28,15 @@ type Loop struct {
 	scanner  *repo.Scanner  // nil when token encryption not configured
 	logger   *slog.Logger
 	mem      *memory.Client // nil when MEM0_API_KEY not set
-	running  atomic.Bool
 	cycleNum atomic.Int64
+
+	// cycleSem (capacity 1) serializes cycles so a manual trigger never
+	// overlaps the background loop (which would duplicate every LLM call in
+	// the cycle). A channel rather than a mutex so waiters can give up.
+	cycleSem chan struct{}
+	// manualRan is signalled after a manual cycle so the background loop
+	// restarts its interval instead of running again right behind it.
+	manualRan chan struct{}
 }
 
 // NewLoop creates a new agent loop.
@@ -38,14 +48,14 @@ func NewLoop(database *db.DB, pipeline *classify.Pipeline, wsManager *ws.Manager
 		scanner:  scanner,
 		logger:   logger,
 		mem:      mem,
+
+		cycleSem:  make(chan struct{}, 1),
+		manualRan: make(chan struct{}, 1),
 	}
 }
 
 // Run starts the background agent loop. It blocks until ctx is cancelled.
 func (l *Loop) Run(ctx context.Context) error {
-	l.running.Store(true)
-	defer l.running.Store(false)
-
 	// Wait for server to be ready
 	select {
 	case <-ctx.Done():
@@ -60,19 +70,61 @@ func (l *Loop) Run(ctx context.Context) error {
 		default:
 		}
 
-		l.runCycle(ctx)
+		if _, err := l.lockedCycle(ctx); err != nil {
+			return err
+		}
+
+		if err := l.waitInterval(ctx); err != nil {
+			return err
+		}
+	}
+}
 
+// waitInterval sleeps for the cycle interval, restarting it whenever a manual
+// cycle completes in the meantime.
+func (l *Loop) waitInterval(ctx context.Context) error {
+	timer := time.NewTimer(cycleInterval)
+	defer timer.Stop()
+	for {
 		select {
 		case <-ctx.Done():
 			return ctx.Err()
-		case <-time.After(30 * time.Second):
+		case <-timer.C:
+			return nil
+		case <-l.manualRan:
+			if !timer.Stop() {
+				<-timer.C
+			}
+			timer.Reset(cycleInterval)
 		}
 	}
 }
 
 // RunOnce executes a single Peek → Poke → Patch cycle. Used for manual triggers.
-func (l *Loop) RunOnce(ctx context.Context) *CycleResult {
-	return l.runCycle(ctx)
+// If a background cycle is in progress, it waits for it to finish first, and
+// returns ctx.Err() without running if ctx is done before then.
+func (l *Loop) RunOnce(ctx context.Context) (*CycleResult, error) {
+	result, err := l.lockedCycle(ctx)
+	if err != nil {
+		return nil, err
+	}
+	select {
+	case l.manualRan <- struct{}{}:
+	default:
+	}
+	return result, nil
+}
+
+// lockedCycle runs one cycle while holding cycleSem, giving up if ctx is done
+// before the semaphore is acquired.
+func (l *Loop) lockedCycle(ctx context.Context) (*CycleResult, error) {
+	select {
+	case l.cycleSem <- struct{}{}:
+	case <-ctx.Done():
+		return nil, ctx.Err()
+	}
+	defer func() { <-l.cycleSem }()
+	return l.runCycle(ctx), nil
 }
 
 // CycleResult summarises one full cycle.
@@ -82,6 +134,9 @@ type CycleResult struct {
 	Bypasses        int      `json:"bypasses"`
 	PatchRounds     int      `json:"patch_rounds"`
 	StrategiesUsed  []string `json:"strategies_used"`
+	// Stats are the global stats broadcast at the end of the cycle, or nil
+	// if none were fetched.
+	Stats *db.Stats `json:"-"`
 }
 
 func (l *Loop) runCycle(ctx context.Context) *CycleResult {
@@ -139,7 +194,7 @@ func (l *Loop) runCycle(ctx context.Context) *CycleResult {
 		map[string]any{"cycle": cycleID, "discovered": discovered, "bypasses": bypasses})
 
 	// Broadcast updated stats
-	l.broadcastStats(ctx)
+	result.Stats = l.broadcastStats(ctx)
 
 	return result
 }
@@ -200,7 +255,8 @@ func (l *Loop) runPeek(ctx context.Context) int {
 	// Find underexplored categories (fewer than 3 variants)
 	targetCategories := l.pickTargetCategories(coveredCategories)
 
-	discovered := 0
+	// New threats are collected and written in one batch at the end of the phase.
+	var newThreats []db.Threat
 
 	// Use Crusoe LLM to generate novel payloads for each target category
 	for _, cat := range targetCategories {
@@ -223,14 +279,13 @@ Only respond with the JSON array.`, cat, memContext)
 			// Fallback: insert a basic payload for this category
 			if fb, ok := fallbackPayloads[cat]; ok {
 				if !l.threatPayloadExists(threats, fb.payload) {
-					l.db.InsertThreat(ctx, &db.Threat{
+					newThreats = append(newThreats, db.Threat{
 						TechniqueName: fb.name,
 						Category:      cat,
 						Source:        "peek",
 						RawPayload:    fb.payload,
 						Severity:      fb.severity,
 					})
-					discovered++
 				}
 			}
 			continue
@@ -247,17 +302,23 @@ Only respond with the JSON array.`, cat, memContext)
 			if sev == "" {
 				sev = "medium"
 			}
-			l.db.InsertThreat(ctx, &db.Threat{
+			newThreats = append(newThreats, db.Threat{
 				TechniqueName: p.Name,
 				Category:      cat,
 				Source:        "peek",
 				RawPayload:    p.Payload,
 				Severity:      sev,
 			})
-			discovered++
 		}
 	}
 
+	discovered := 0
+	if err := l.db.InsertThreats(ctx, newThreats); err != nil {
+		l.logger.Error("peek: failed to insert threats", "err", err)
+	} else {
+		discovered = len(newThreats)
+	}
+
 	// Store what we learned in memory
 	l.remember(ctx, "peek",
 		fmt.Sprintf("Cycle %d peek: explored categories %v, discovered %d new techniques.",
@@ -371,15 +432,22 @@ func (l *Loop) runPoke(ctx context.Context) int {
 	bypasses := 0
 	var bypassNames []string
 
+	testedIDs := make([]int64, 0, len(testQueue))
+	testedBlocked := make([]bool, 0, len(testQueue))
+
 	for _, t := range testQueue {
 		result := l.pipeline.ClassifyWithRules(ctx, t.RawPayload, nil)
-		l.db.MarkThreatTested(ctx, t.ID, result.Blocked)
+		testedIDs = append(testedIDs, t.ID)
+		testedBlocked = append(testedBlocked, result.Blocked)
 
 		if !result.Blocked {
 			bypasses++
 			bypassNames = append(bypassNames, fmt.Sprintf("%s (%s)", t.TechniqueName, t.Category))
 		}
 	}
+	if err := l.db.MarkThreatsTested(ctx, testedIDs, testedBlocked); err != nil {
+		l.logger.Error("poke: failed to record test results", "err", err)
+	}
 
 	// Remember what we found
 	if bypasses > 0 {
@@ -522,6 +590,7 @@ Only respond with the JSON object.`,
 		l.logger.Error("patch: failed to insert rules", "err", err)
 		return
 	}
+	l.pipeline.InvalidateRules()
 
 	// Re-test bypassing threats with new rules
 	newRules := &db.Rules{
@@ -530,17 +599,22 @@ Only respond with the JSON object.`,
 		ClaudePrompt: patch.ClaudePrompt,
 	}
 
-	fixed := 0
 	stillBypassing := 0
+	var fixedIDs []int64
+	var fixedBlocked []bool
 	for _, t := range bypassing {
 		result := l.pipeline.ClassifyWithRules(ctx, t.RawPayload, newRules)
 		if result.Blocked {
-			l.db.MarkThreatTested(ctx, t.ID, true)
-			fixed++
+			fixedIDs = append(fixedIDs, t.ID)
+			fixedBlocked = append(fixedBlocked, true)
 		} else {
 			stillBypassing++
 		}
 	}
+	fixed := len(fixedIDs)
+	if err := l.db.MarkThreatsTested(ctx, fixedIDs, fixedBlocked); err != nil {
+		l.logger.Error("patch: failed to record re-test results", "err", err)
+	}
 
 	// Remember the outcome
 	outcome := "All bypasses fixed."
@@ -718,6 +792,7 @@ func (l *Loop) runLearn(ctx context.Context) string {
 	regexGapsAdded := 0
 	if len(regexBypasses) > 0 {
 		existingThreats, _ := l.db.GetThreats(ctx, 0)
+		var gapThreats []db.Threat
 		for _, bp := range regexBypasses {
 			payload := bp.RawRequest
 			if len(payload) > 500 {
@@ -727,14 +802,18 @@ func (l *Loop) runLearn(ctx context.Context) string {
 			if l.threatPayloadExists(existingThreats, payload) {
 				continue
 			}
-			l.db.InsertThreat(ctx, &db.Threat{
+			gapThreats = append(gapThreats, db.Threat{
 				TechniqueName: fmt.Sprintf("LLM-caught %s bypass", bp.AttackType),
 				Category:      bp.AttackType,
 				Source:        "learn",
 				RawPayload:    payload,
 				Severity:      "high",
 			})
-			regexGapsAdded++
+		}
+		if err := l.db.InsertThreats(ctx, gapThreats); err != nil {
+			l.logger.Warn("learn: failed to insert regex-bypass threats", "err", err)
+		} else {
+			regexGapsAdded = len(gapThreats)
 		}
 		if regexGapsAdded > 0 {
 			l.logger.Info("learn: added regex-bypass threats for future patching",
@@ -860,21 +939,26 @@ func (l *Loop) broadcast(agent, status, detail string) {
 	}
 }
 
-func (l *Loop) broadcastStats(ctx context.Context) {
+// broadcastStats pushes fresh global stats to dashboards and returns them, so
+// callers that also need them can skip a second scan of request_log.
+func (l *Loop) broadcastStats(ctx context.Context) *db.Stats {
 	if l.ws == nil {
-		return
+		return nil
 	}
 	stats, err := l.db.GetGlobalStats(ctx)
 	if err != nil {
-		return
+		return nil
 	}
 	l.ws.Broadcast(map[string]any{
 		"type":             "stats",
 		"total_requests":   stats.TotalRequests,
 		"blocked_requests": stats.BlockedCount,
 		"total_threats":    stats.ThreatCount,
+		"threats_blocked":  stats.ThreatsBlocked,
 		"block_rate":       safeBlockRate(stats.TotalRequests, stats.BlockedCount),
+		"rules_version":    stats.RulesVersion,
 	})
+	return stats
 }
 
 func safeBlockRate(total, blocked int64) float64 {
@@ -34,6 +34,11 @@ type OAuthHandler struct {
 	logger    *slog.Logger
 	encryptor *TokenEncryptor // may be nil if TOKEN_ENCRYPTION_KEY not set
 
+	// Authorize URLs up to (but excluding) the per-request state value,
+	// built once from the static config.
+	loginAuthURL       string
+	repoConnectAuthURL string
+
 	// In-memory state store (pending OAuth states, TTL 10 min)
 	mu     sync.Mutex
 	states map[string]*oauthState
@@ -55,9 +60,22 @@ func NewOAuthHandler(cfg OAuthConfig, sm *SessionManager, database *db.DB, logge
 		encryptor: enc,
 		states:    make(map[string]*oauthState),
 	}
+	h.loginAuthURL = authorizeURLPrefix(cfg, "read:user")
+	h.repoConnectAuthURL = authorizeURLPrefix(cfg, "read:user repo")
 	return h
 }
 
+// authorizeURLPrefix encodes the static GitHub authorize parameters for a
+// scope, ending in "state=" so callers only append the (URL-safe hex) state.
+func authorizeURLPrefix(cfg OAuthConfig, scope string) string {
+	params := url.Values{
+		"client_id":    {cfg.ClientID},
+		"scope":        {scope},
+		"redirect_uri": {cfg.BaseURL + "/auth/github/callback"},
+	}
+	return "https://github.com/login/oauth/authorize?" + params.Encode() + "&state="
+}
+
 func (h *OAuthHandler) generateState(purpose string, userID int, siteID string) string {
 	b := make([]byte, 16)
 	rand.Read(b)
@@ -108,13 +126,7 @@ func (h *OAuthHandler) StateCleanupLoop(ctx context.Context) {
 // BeginLogin redirects to GitHub OAuth (read:user scope).
 func (h *OAuthHandler) BeginLogin(w http.ResponseWriter, r *http.Request) {
 	state := h.generateState("login", 0, "")
-	params := url.Values{
-		"client_id":    {h.cfg.ClientID},
-		"scope":        {"read:user"},
-		"state":        {state},
-		"redirect_uri": {h.cfg.BaseURL + "/auth/github/callback"},
-	}
-	http.Redirect(w, r, "https://github.com/login/oauth/authorize?"+params.Encode(), http.StatusFound)
+	http.Redirect(w, r, h.loginAuthURL+state, http.StatusFound)
 }
 
 // BeginRepoConnect redirects to GitHub OAuth with repo scope.
@@ -130,13 +142,7 @@ func (h *OAuthHandler) BeginRepoConnect(w http.ResponseWriter, r *http.Request)
 		return
 	}
 	state := h.generateState("repo-connect", user.ID, siteID)
-	params := url.Values{
-		"client_id":    {h.cfg.ClientID},
-		"scope":        {"read:user repo"},
-		"state":        {state},
-		"redirect_uri": {h.cfg.BaseURL + "/auth/github/callback"},
-	}
-	http.Redirect(w, r, "https://github.com/login/oauth/authorize?"+params.Encode(), http.StatusFound)
+	http.Redirect(w, r, h.repoConnectAuthURL+state, http.StatusFound)
 }
 
 // Callback handles the OAuth callback.
@@ -7,6 +7,7 @@ import (
 	"log/slog"
 	"net"
 	"net/http"
+	"sync"
 	"time"
 
 	"github.com/jackc/pgx/v5"
@@ -18,14 +19,47 @@ const (
 	SessionMaxAge = 30 * 24 * time.Hour // 30 days
 )
 
+// userCacheTTL bounds how long a user row is served from memory. Users only
+// change on login (which refreshes the entry), so this is mostly a safety net.
+const userCacheTTL = 30 * time.Second
+
+// sessionCacheTTL bounds how long a session lookup is served from memory.
+// Logout evicts the entry immediately; the TTL only matters for sessions
+// deleted out of band.
+const sessionCacheTTL = 30 * time.Second
+
+type cachedUser struct {
+	user    *db.User
+	expires time.Time
+}
+
+type cachedSession struct {
+	userID    int
+	expiresAt time.Time // session expiry
+	cachedTil time.Time // cache entry expiry
+}
+
 type SessionManager struct {
 	db     *db.DB
 	logger *slog.Logger
 	secure bool // true in production (Secure cookie flag)
+
+	usersMu sync.RWMutex
+	users   map[int]cachedUser // user ID -> user, saves a query per authenticated request
+
+	sessionsMu sync.RWMutex
+	sessions   map[string]cachedSession // session ID -> owner, saves a query per authenticated request
 }
 
 func NewSessionManager(database *db.DB, logger *slog.Logger, production bool) *SessionManager {
-	return &SessionManager{db: database, logger: logger, secure: production}
+	return &SessionManager{
+		db:     database,
+		logger: logger,
+		secure: production,
+		users:  make(map[int]cachedUser),
+
+		sessions: make(map[string]cachedSession),
+	}
 }
 
 // Create inserts a session row and sets the cookie.
@@ -41,6 +75,8 @@ func (sm *SessionManager) Create(ctx context.Context, w http.ResponseWriter, use
 	if err != nil {
 		return err
 	}
+	// The user row was just upserted on login — drop any stale copy.
+	sm.forgetUser(userID)
 
 	http.SetCookie(w, &http.Cookie{
 		Name:     SessionCookie,
@@ -60,25 +96,114 @@ func (sm *SessionManager) Validate(ctx context.Context, r *http.Request) (*db.Us
 	if err != nil {
 		return nil, nil // no cookie = not logged in
 	}
+	if !validSessionID(cookie.Value) {
+		return nil, nil // malformed cookie: reject without a DB round trip
+	}
+
+	userID, ok, err := sm.getSession(ctx, cookie.Value)
+	if err != nil || !ok {
+		return nil, err
+	}
+
+	return sm.getUser(ctx, userID)
+}
+
+// getSession resolves a live session to its user ID, from the in-process
+// cache when possible. It reports false for unknown or expired sessions.
+func (sm *SessionManager) getSession(ctx context.Context, sessionID string) (int, bool, error) {
+	now := time.Now()
+	sm.sessionsMu.RLock()
+	e, ok := sm.sessions[sessionID]
+	sm.sessionsMu.RUnlock()
+	if ok && now.Before(e.cachedTil) {
+		if e.expiresAt.Before(now) {
+			return 0, false, nil
+		}
+		return e.userID, true, nil
+	}
 
-	session, err := sm.db.GetSession(ctx, cookie.Value)
+	session, err := sm.db.GetSession(ctx, sessionID)
 	if err != nil {
 		if errors.Is(err, pgx.ErrNoRows) {
-			return nil, nil // session not found = not logged in
+			return 0, false, nil // session not found = not logged in
 		}
-		return nil, fmt.Errorf("get session: %w", err)
+		return 0, false, fmt.Errorf("get session: %w", err)
 	}
-	if session == nil || session.ExpiresAt.Before(time.Now()) {
-		return nil, nil // expired or not found
+	if session == nil || session.ExpiresAt.Before(now) {
+		return 0, false, nil // expired or not found
 	}
 
-	return sm.db.GetUserByID(ctx, session.UserID)
+	sm.sessionsMu.Lock()
+	for k, c := range sm.sessions {
+		if now.After(c.cachedTil) {
+			delete(sm.sessions, k)
+		}
+	}
+	sm.sessions[sessionID] = cachedSession{
+		userID:    session.UserID,
+		expiresAt: session.ExpiresAt,
+		cachedTil: now.Add(sessionCacheTTL),
+	}
+	sm.sessionsMu.Unlock()
+	return session.UserID, true, nil
+}
+
+// validSessionID reports whether s is a canonical UUID
+// (xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx), the only form session IDs take.
+// Anything else cannot match a session row, and passing it to Postgres would
+// only produce a uuid cast error.
+func validSessionID(s string) bool {
+	if len(s) != 36 {
+		return false
+	}
+	for i := 0; i < len(s); i++ {
+		c := s[i]
+		switch i {
+		case 8, 13, 18, 23:
+			if c != '-' {
+				return false
+			}
+		default:
+			if !('0' <= c && c <= '9' || 'a' <= c && c <= 'f' || 'A' <= c && c <= 'F') {
+				return false
+			}
+		}
+	}
+	return true
+}
+
+// getUser returns the user from the in-process cache, loading it on a miss.
+func (sm *SessionManager) getUser(ctx context.Context, userID int) (*db.User, error) {
+	sm.usersMu.RLock()
+	e, ok := sm.users[userID]
+	sm.usersMu.RUnlock()
+	if ok && time.Now().Before(e.expires) {
+		return e.user, nil
+	}
+
+	user, err := sm.db.GetUserByID(ctx, userID)
+	if err != nil {
+		return nil, err
+	}
+	sm.usersMu.Lock()
+	sm.users[userID] = cachedUser{user: user, expires: time.Now().Add(userCacheTTL)}
+	sm.usersMu.Unlock()
+	return user, nil
+}
+
+func (sm *SessionManager) forgetUser(userID int) {
+	sm.usersMu.Lock()
+	delete(sm.users, userID)
+	sm.usersMu.Unlock()
 }
 
 // Destroy deletes the session and clears the cookie.
 func (sm *SessionManager) Destroy(ctx context.Context, w http.ResponseWriter, r *http.Request) {
 	cookie, err := r.Cookie(SessionCookie)
 	if err == nil {
+		sm.sessionsMu.Lock()
+		delete(sm.sessions, cookie.Value)
+		sm.sessionsMu.Unlock()
 		sm.db.DeleteSession(ctx, cookie.Value)
 	}
 
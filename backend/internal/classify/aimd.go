@@ -0,0 +1,133 @@
+package classify
+
+import (
+	"context"
+	"net/http"
+	"strconv"
+	"sync"
+	"time"
+)
+
+const (
+	llmInitialConcurrency = 8
+	llmMinConcurrency     = 1
+	llmMaxConcurrency     = 32
+	// llmBackoff is how long a provider gets no new calls after throttling us
+	// when it doesn't send a usable Retry-After.
+	llmBackoff    = 2 * time.Second
+	llmMaxBackoff = 30 * time.Second
+)
+
+// aimdLimiter caps concurrent calls to one LLM provider. The cap grows by
+// about one slot per cap's worth of successful calls and halves whenever the
+// provider throttles (additive increase, multiplicative decrease), so bursts
+// of proxied traffic settle near the highest rate the provider accepts
+// instead of cascading into 429s.
+type aimdLimiter struct {
+	mu           sync.Mutex
+	limit        float64
+	inflight     int
+	backoffUntil time.Time
+	wake         chan struct{} // closed and replaced when a slot may be free
+}
+
+var (
+	crusoeLimiter = newAIMDLimiter()
+	claudeLimiter = newAIMDLimiter()
+)
+
+func newAIMDLimiter() *aimdLimiter {
+	return &aimdLimiter{limit: llmInitialConcurrency, wake: make(chan struct{})}
+}
+
+// acquire blocks until a call slot is free and the provider isn't in
+// backoff, or ctx is done.
+func (l *aimdLimiter) acquire(ctx context.Context) error {
+	for {
+		l.mu.Lock()
+		wait := time.Until(l.backoffUntil)
+		if wait <= 0 && l.inflight < int(l.limit) {
+			l.inflight++
+			l.mu.Unlock()
+			return nil
+		}
+		wake := l.wake
+		l.mu.Unlock()
+
+		var timer *time.Timer
+		var expired <-chan time.Time
+		if wait > 0 {
+			timer = time.NewTimer(wait)
+			expired = timer.C
+		}
+		select {
+		case <-wake:
+		case <-expired:
+		case <-ctx.Done():
+		}
+		if timer != nil {
+			timer.Stop()
+		}
+		if err := ctx.Err(); err != nil {
+			return err
+		}
+	}
+}
+
+// callOutcome is how a limited call ended, as far as the limiter cares.
+type callOutcome int
+
+const (
+	// callAborted: the call was cancelled or failed for reasons other than
+	// rate limiting. It says nothing about the provider's capacity.
+	callAborted callOutcome = iota
+	// callOK: the provider answered.
+	callOK
+	// callThrottled: the provider rejected the call for rate reasons.
+	callThrottled
+)
+
+// release frees the slot taken by acquire and adjusts the cap: up for a
+// completed call, down for a throttled one, unchanged for an aborted one.
+// retryAfter is the provider's requested pause, or zero. Throttles arriving
+// while a backoff is already in effect are responses to the same overload,
+// so they don't halve the cap again.
+func (l *aimdLimiter) release(outcome callOutcome, retryAfter time.Duration) {
+	l.mu.Lock()
+	l.inflight--
+	switch outcome {
+	case callThrottled:
+		now := time.Now()
+		if now.Before(l.backoffUntil) {
+			break
+		}
+		l.limit = max(llmMinConcurrency, l.limit/2)
+		if retryAfter <= 0 {
+			retryAfter = llmBackoff
+		}
+		l.backoffUntil = now.Add(min(retryAfter, llmMaxBackoff))
+	case callOK:
+		l.limit = min(llmMaxConcurrency, l.limit+1/l.limit)
+	}
+	close(l.wake)
+	l.wake = make(chan struct{})
+	l.mu.Unlock()
+}
+
+// isThrottleStatus reports whether an HTTP status means the provider is
+// shedding load (rate limited, overloaded or temporarily unavailable).
+func isThrottleStatus(code int) bool {
+	return code == http.StatusTooManyRequests || code == http.StatusServiceUnavailable || code == 529
+}
+
+// retryAfterHeader parses a Retry-After header given in seconds.
+func retryAfterHeader(h http.Header) time.Duration {
+	if h == nil {
+		return 0
+	}
+	secs, err := strconv.Atoi(h.Get("Retry-After"))
+	if err != nil || secs <= 0 {
+		return 0
+	}
+	return time.Duration(secs) * time.Second
+}
@@ -0,0 +1,227 @@
+package classify
+
+import (
+	"crypto/sha256"
+	"encoding/binary"
+	"strings"
+	"sync"
+	"time"
+
+	"github.com/veil-waf/veil-go/internal/db"
+)
+
+const (
+	resultCacheTTL     = 60 * time.Second
+	resultCacheMaxSize = 10000
+)
+
+type cacheKey [sha256.Size]byte
+
+type cacheEntry struct {
+	result  Result
+	expires time.Time
+}
+
+// resultCache is an exact-match TTL cache of verdicts keyed by a request
+// hash. The pipeline keys it on the rules and the raw request, so
+// identical requests (e.g. an SPA fetching the same endpoint on every page
+// load) skip both LLM stages; the regex stage keys it on the request alone.
+type resultCache struct {
+	mu      sync.Mutex
+	entries map[cacheKey]cacheEntry
+}
+
+func newResultCache() *resultCache {
+	return &resultCache{entries: make(map[cacheKey]cacheEntry)}
+}
+
+// resultCacheKey hashes the rules and the raw request. The rules are hashed
+// by their prompts, not just their version: version numbers aren't unique
+// across sites, and the built-in defaults and a site's first patched rules
+// both carry version 1, so keying on the version alone would hand verdicts
+// made under one set of prompts to requests classified under another.
+// Per-request ID headers (see idHeaders) are hashed as a placeholder: they
+// differ on every request, so hashing them verbatim would make a client that
+// sends one miss the cache on every replay.
+func resultCacheKey(rules *db.Rules, rawRequest string) cacheKey {
+	h := sha256.New()
+	var v [8]byte
+	binary.LittleEndian.PutUint64(v[:], uint64(rules.Version))
+	h.Write(v[:])
+	// Length-prefix the prompts so their boundaries are unambiguous.
+	for _, prompt := range []string{rules.CrusoePrompt, rules.ClaudePrompt} {
+		binary.LittleEndian.PutUint64(v[:], uint64(len(prompt)))
+		h.Write(v[:])
+		h.Write([]byte(prompt))
+	}
+
+	// Headers run from the second line to the blank line before the body.
+	head, body, hasBody := strings.Cut(rawRequest, "\n\n")
+	for i, line := range strings.Split(head, "\n") {
+		if i > 0 {
+			h.Write([]byte{'\n'})
+			if name, value, ok := strings.Cut(line, ": "); ok && isIDHeader(name, value) {
+				h.Write([]byte(name))
+				h.Write([]byte(": \x00id"))
+				continue
+			}
+		}
+		h.Write([]byte(line))
+	}
+	if hasBody {
+		h.Write([]byte("\n\n"))
+		h.Write([]byte(body))
+	}
+
+	var k cacheKey
+	h.Sum(k[:0])
+	return k
+}
+
+// idHeaders maps the headers, lowercased, whose values are normalized out of
+// the cache key to the format their values must have. It is an explicit list
+// rather than a match on the value's shape alone: hex digits can encode
+// anything (27204f5220313d31 is "' OR 1=1"), so an arbitrary header holding
+// hex may be a payload an LLM should see.
+var idHeaders = map[string]func(string) bool{
+	"x-request-id":     isOpaqueID,
+	"x-correlation-id": isOpaqueID,
+	"traceparent":      isOpaqueID,
+	"x-amzn-trace-id":  isAmznTraceID,
+}
+
+// isIDHeader reports whether the header is a known per-request ID header
+// holding a well-formed ID.
+func isIDHeader(name, value string) bool {
+	valid, ok := idHeaders[strings.ToLower(name)]
+	return ok && valid(value)
+}
+
+// isAmznTraceID reports whether v is an AWS trace header:
+// ";"-separated Key=value fields with hex-and-dash values, e.g.
+// Root=1-5759e988-bd862e3fe1be46a994272793;Sampled=1.
+func isAmznTraceID(v string) bool {
+	if len(v) > 256 {
+		return false
+	}
+	for _, field := range strings.Split(v, ";") {
+		key, value, ok := strings.Cut(field, "=")
+		if !ok || key == "" || value == "" {
+			return false
+		}
+		for i := 0; i < len(key); i++ {
+			if c := key[i] | 0x20; c < 'a' || c > 'z' {
+				return false
+			}
+		}
+		for i := 0; i < len(value); i++ {
+			if !isHexOrDash(value[i]) {
+				return false
+			}
+		}
+	}
+	return true
+}
+
+// isOpaqueID reports whether v looks like a generated identifier: 16 to 128
+// hex digits, optionally grouped by single dashes (UUIDs, W3C traceparent).
+func isOpaqueID(v string) bool {
+	if len(v) < 16 || len(v) > 128 || v[0] == '-' || v[len(v)-1] == '-' || strings.Contains(v, "--") {
+		return false
+	}
+	for i := 0; i < len(v); i++ {
+		if !isHexOrDash(v[i]) {
+			return false
+		}
+	}
+	return true
+}
+
+func isHexOrDash(c byte) bool {
+	return '0' <= c && c <= '9' || 'a' <= c && c <= 'f' || 'A' <= c && c <= 'F' || c == '-'
+}
+
+// get returns a copy of the cached result, or nil on a miss or expired entry.
+func (c *resultCache) get(k cacheKey) *Result {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	e, ok := c.entries[k]
+	if !ok {
+		return nil
+	}
+	if time.Now().After(e.expires) {
+		delete(c.entries, k)
+		return nil
+	}
+	r := e.result
+	return &r
+}
+
+func (c *resultCache) put(k cacheKey, r *Result) {
+	now := time.Now()
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if len(c.entries) >= resultCacheMaxSize {
+		// Drop expired entries first; if the cache is still full, evict a
+		// tenth of it, arbitrary entries (map iteration order), so a full
+		// cache pays for this sweep once per many puts, not on every one.
+		for key, e := range c.entries {
+			if now.After(e.expires) {
+				delete(c.entries, key)
+			}
+		}
+		for key := range c.entries {
+			if len(c.entries) < resultCacheMaxSize*9/10 {
+				break
+			}
+			delete(c.entries, key)
+		}
+	}
+	c.entries[k] = cacheEntry{result: *r, expires: now.Add(resultCacheTTL)}
+}
+
+// inflightCall is a classification in progress that other callers with the
+// same key can wait on.
+type inflightCall struct {
+	wg     sync.WaitGroup
+	result Result
+}
+
+// inflightGroup coalesces concurrent classifications of the same request so
+// a burst of identical payloads (bot traffic, client retries) costs one set of
+// LLM calls instead of N.
+type inflightGroup struct {
+	mu    sync.Mutex
+	calls map[cacheKey]*inflightCall
+}
+
+func newInflightGroup() *inflightGroup {
+	return &inflightGroup{calls: make(map[cacheKey]*inflightCall)}
+}
+
+// do runs fn once per key at a time; concurrent callers with the same key
+// wait for and share the first caller's result. Each caller gets its own copy.
+func (g *inflightGroup) do(k cacheKey, fn func() *Result) *Result {
+	g.mu.Lock()
+	if c, ok := g.calls[k]; ok {
+		g.mu.Unlock()
+		c.wg.Wait()
+		r := c.result
+		return &r
+	}
+	c := &inflightCall{}
+	c.wg.Add(1)
+	g.calls[k] = c
+	g.mu.Unlock()
+
+	defer func() {
+		g.mu.Lock()
+		delete(g.calls, k)
+		g.mu.Unlock()
+		c.wg.Done()
+	}()
+
+	r := fn()
+	c.result = *r
+	return r
+}
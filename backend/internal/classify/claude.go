@@ -2,60 +2,133 @@ package classify
 
 import (
 	"context"
+	"errors"
 	"fmt"
 	"os"
 	"strings"
+	"sync"
 	"time"
 
 	"github.com/anthropics/anthropic-sdk-go"
 	"github.com/anthropics/anthropic-sdk-go/bedrock"
 )
 
+// claudeConfig is the Bedrock configuration, read from the environment once
+// on first use rather than on every classification. The region is resolved by
+// the AWS SDK's default config chain.
+type claudeConfig struct {
+	model   string
+	enabled bool // AWS credentials are available
+}
+
+var claudeEnv = sync.OnceValue(func() claudeConfig {
+	cfg := claudeConfig{model: os.Getenv("BEDROCK_MODEL")}
+	if cfg.model == "" {
+		cfg.model = "global.anthropic.claude-sonnet-4-5-20250929-v1:0"
+	}
+	cfg.enabled = os.Getenv("AWS_ACCESS_KEY_ID") != "" || os.Getenv("AWS_PROFILE") != ""
+	return cfg
+})
+
+// bedrockClient is shared by every Bedrock call. Building a client runs the
+// AWS default config chain (env, shared files, possibly instance metadata)
+// and creates a fresh HTTP transport, so a client per call paid for that
+// plus a new TLS handshake on every classification. Credentials from the
+// chain are cached and refreshed by the client itself.
+var bedrockClient = sync.OnceValue(func() anthropic.Client {
+	return anthropic.NewClient(bedrock.WithLoadDefaultConfig(context.Background()))
+})
+
+// BedrockClient returns the process-wide Claude-on-Bedrock client.
+func BedrockClient() anthropic.Client {
+	return bedrockClient()
+}
+
 // ClaudeClassify calls Claude via AWS Bedrock for deep request analysis.
 func ClaudeClassify(ctx context.Context, raw, systemPrompt string) *Result {
-	region := os.Getenv("AWS_REGION")
-	if region == "" {
-		region = "eu-west-1"
-	}
-	model := os.Getenv("BEDROCK_MODEL")
-	if model == "" {
-		model = "global.anthropic.claude-sonnet-4-5-20250929-v1:0"
-	}
+	cfg := claudeEnv()
 
 	// Check if AWS credentials are available
-	if os.Getenv("AWS_ACCESS_KEY_ID") == "" && os.Getenv("AWS_PROFILE") == "" {
+	if !cfg.enabled {
 		return &Result{
 			Classification: "SUSPICIOUS",
 			Confidence:     0.5,
+			failed:         true,
 			AttackType:     "none",
 			Reason:         "AWS credentials not configured",
 			Classifier:     "claude",
 		}
 	}
 
-	start := time.Now()
+	if err := claudeLimiter.acquire(ctx); err != nil {
+		return &Result{
+			Classification: "SUSPICIOUS",
+			Confidence:     0.5,
+			failed:         true,
+			AttackType:     "none",
+			Reason:         "Claude call cancelled while queued",
+			Classifier:     "claude",
+		}
+	}
+	outcome := callAborted
+	var backoff time.Duration
+	defer func() { claudeLimiter.release(outcome, backoff) }()
 
-	client := anthropic.NewClient(
-		bedrock.WithLoadDefaultConfig(ctx),
-	)
+	start := time.Now()
 
-	message, err := client.Messages.New(ctx, anthropic.MessageNewParams{
-		Model:     anthropic.Model(model),
+	// Stream the reply and stop reading once the verdict object closes:
+	// the model often keeps generating after the JSON, and waiting for
+	// max_tokens only adds latency. Cancelling ctx aborts the stream.
+	ctx, cancel := context.WithCancel(ctx)
+	defer cancel()
+	stream := bedrockClient().Messages.NewStreaming(ctx, anthropic.MessageNewParams{
+		Model:     anthropic.Model(cfg.model),
 		MaxTokens: 300,
+		// The system prompt is the same for every request under a rules
+		// version; mark it cacheable so Bedrock bills and processes it once
+		// per cache window instead of per classification. Prompts below the
+		// model's minimum cacheable length are simply sent uncached.
 		System: []anthropic.TextBlockParam{
-			{Text: systemPrompt},
+			{Text: systemPrompt, CacheControl: anthropic.NewCacheControlEphemeralParam()},
 		},
 		Messages: []anthropic.MessageParam{
 			anthropic.NewUserMessage(anthropic.NewTextBlock(raw)),
 		},
 	})
+	defer stream.Close()
+
+	var text strings.Builder
+	var obj objectScanner
+	complete := false
+	for !complete && stream.Next() {
+		block, ok := stream.Current().AsAny().(anthropic.ContentBlockDeltaEvent)
+		if !ok {
+			continue
+		}
+		if delta, ok := block.Delta.AsAny().(anthropic.TextDelta); ok {
+			text.WriteString(delta.Text)
+			complete = obj.feed(delta.Text)
+		}
+	}
+	err := stream.Err()
 
 	elapsed := float64(time.Since(start).Milliseconds())
 
-	if err != nil {
+	if err != nil && !complete {
+		// A cancelled stream (e.g. the pipeline no longer needs this verdict)
+		// or a transport error stays callAborted: it didn't complete, so it
+		// shouldn't grow the limit.
+		var apiErr *anthropic.Error
+		if errors.As(err, &apiErr) && isThrottleStatus(apiErr.StatusCode) {
+			outcome = callThrottled
+			if apiErr.Response != nil {
+				backoff = retryAfterHeader(apiErr.Response.Header)
+			}
+		}
 		return &Result{
 			Classification: "SUSPICIOUS",
 			Confidence:     0.5,
+			failed:         true,
 			AttackType:     "none",
 			Reason:         fmt.Sprintf("Claude API error: %v", err),
 			Classifier:     "claude",
@@ -63,10 +136,14 @@ func ClaudeClassify(ctx context.Context, raw, systemPrompt string) *Result {
 		}
 	}
 
-	if len(message.Content) == 0 {
+	outcome = callOK
+
+	content := strings.TrimSpace(text.String())
+	if content == "" {
 		return &Result{
 			Classification: "SUSPICIOUS",
 			Confidence:     0.5,
+			failed:         true,
 			AttackType:     "none",
 			Reason:         "Empty Claude response",
 			Classifier:     "claude",
@@ -74,35 +151,61 @@ func ClaudeClassify(ctx context.Context, raw, systemPrompt string) *Result {
 		}
 	}
 
-	content := strings.TrimSpace(message.Content[0].Text)
 	result := parseJSONResult(content)
 	result.Classifier = "claude"
 	result.ResponseTimeMs = elapsed
 	return result
 }
 
+// objectScanner tracks streamed text to find where its first top-level JSON
+// object ends. Quotes outside any object are prose and ignored.
+type objectScanner struct {
+	depth    int
+	inString bool
+	escaped  bool
+}
+
+// feed consumes the next chunk of text and reports whether the first
+// top-level object has closed.
+func (s *objectScanner) feed(chunk string) bool {
+	for i := 0; i < len(chunk); i++ {
+		c := chunk[i]
+		switch {
+		case s.inString:
+			switch {
+			case s.escaped:
+				s.escaped = false
+			case c == '\\':
+				s.escaped = true
+			case c == '"':
+				s.inString = false
+			}
+		case c == '"':
+			s.inString = s.depth > 0
+		case c == '{':
+			s.depth++
+		case c == '}' && s.depth > 0:
+			s.depth--
+			if s.depth == 0 {
+				return true
+			}
+		}
+	}
+	return false
+}
+
 // ClaudeGenerate calls Claude via AWS Bedrock and returns the raw text response.
 // Used by agents that need freeform LLM output (not classifier-shaped JSON).
 func ClaudeGenerate(ctx context.Context, userPrompt, systemPrompt string) (string, error) {
-	region := os.Getenv("AWS_REGION")
-	if region == "" {
-		region = "eu-west-1"
-	}
-	model := os.Getenv("BEDROCK_MODEL")
-	if model == "" {
-		model = "global.anthropic.claude-sonnet-4-5-20250929-v1:0"
-	}
-
-	if os.Getenv("AWS_ACCESS_KEY_ID") == "" && os.Getenv("AWS_PROFILE") == "" {
+	cfg := claudeEnv()
+	if !cfg.enabled {
 		return "", fmt.Errorf("AWS credentials not configured")
 	}
 
-	client := anthropic.NewClient(
-		bedrock.WithLoadDefaultConfig(ctx),
-	)
+	client := bedrockClient()
 
 	message, err := client.Messages.New(ctx, anthropic.MessageNewParams{
-		Model:     anthropic.Model(model),
+		Model:     anthropic.Model(cfg.model),
 		MaxTokens: 1024,
 		System: []anthropic.TextBlockParam{
 			{Text: systemPrompt},
@@ -5,6 +5,7 @@ import (
 	"embed"
 	"regexp"
 	"strings"
+	"unicode/utf8"
 )
 
 //go:embed crowdsec-data/*.txt
@@ -12,7 +13,7 @@ var crowdsecData embed.FS
 
 // Compiled CrowdSec pattern sets — loaded once at init.
 var (
-	crowdsecBadUAs          []*regexp.Regexp
+	crowdsecBadUAs          []uaPattern
 	crowdsecSQLiPatterns    []string // plain string contains-match (URL-decoded)
 	crowdsecXSSPatterns     []string
 	crowdsecPathPatterns    []string
@@ -21,14 +22,56 @@ var (
 	crowdsecLog4ShPatterns  []string // JNDI/Log4Shell + SSTI patterns
 )
 
+// uaPattern is a bad user-agent regex plus the longest literal it requires,
+// lowercased. Nearly all of the 600+ patterns are a plain \bName\b, so a
+// substring check rules most of them out without running the regex.
+type uaPattern struct {
+	re      *regexp.Regexp
+	literal string // "" when none could be extracted: always run re
+}
+
 func init() {
-	crowdsecBadUAs = loadRegexFile("crowdsec-data/bad_user_agents.txt")
-	crowdsecSQLiPatterns = loadStringFile("crowdsec-data/sqli_patterns.txt")
-	crowdsecXSSPatterns = loadStringFile("crowdsec-data/xss_patterns.txt")
-	crowdsecPathPatterns = loadStringFile("crowdsec-data/path_traversal.txt")
-	crowdsecBackdoorPaths = loadStringFile("crowdsec-data/backdoors.txt")
-	crowdsecCmdInjPatterns = loadStringFile("crowdsec-data/command_injection.txt")
-	crowdsecLog4ShPatterns = loadStringFile("crowdsec-data/log4shell.txt")
+	// String patterns are case-folded here, once, in the case each matcher
+	// compares in, so a request only folds its own text.
+	for _, re := range loadRegexFile("crowdsec-data/bad_user_agents.txt") {
+		crowdsecBadUAs = append(crowdsecBadUAs, uaPattern{re: re, literal: requiredLiteral(strings.TrimPrefix(re.String(), "(?i)"))})
+	}
+	crowdsecSQLiPatterns = foldAll(loadStringFile("crowdsec-data/sqli_patterns.txt"), strings.ToUpper)
+	crowdsecXSSPatterns = foldAll(loadStringFile("crowdsec-data/xss_patterns.txt"), strings.ToUpper)
+	crowdsecPathPatterns = foldAll(loadStringFile("crowdsec-data/path_traversal.txt"), strings.ToUpper)
+	crowdsecBackdoorPaths = foldAll(loadStringFile("crowdsec-data/backdoors.txt"), func(p string) string {
+		return "/" + strings.ToLower(p)
+	})
+	crowdsecCmdInjPatterns = foldAll(loadStringFile("crowdsec-data/command_injection.txt"), strings.ToLower)
+	crowdsecLog4ShPatterns = foldAll(loadStringFile("crowdsec-data/log4shell.txt"), strings.ToLower)
+}
+
+func foldAll(patterns []string, fold func(string) string) []string {
+	for i, p := range patterns {
+		patterns[i] = fold(p)
+	}
+	return patterns
+}
+
+// containsAny reports whether folded contains any of the pre-folded patterns.
+func containsAny(folded string, patterns []string) bool {
+	for _, pat := range patterns {
+		if strings.Contains(folded, pat) {
+			return true
+		}
+	}
+	return false
+}
+
+// anyContainsAny reports whether any of the folded texts contains any of the
+// patterns, checking each text on its own.
+func anyContainsAny(folded []string, patterns []string) bool {
+	for _, s := range folded {
+		if containsAny(s, patterns) {
+			return true
+		}
+	}
+	return false
 }
 
 // loadRegexFile reads a file of regex patterns (one per line, # comments) and
@@ -58,6 +101,62 @@ func loadRegexFile(name string) []*regexp.Regexp {
 	return out
 }
 
+// requiredLiteral returns the longest lowercased run of literal text that
+// every match of pattern must contain, or "" if the pattern uses anything
+// beyond word boundaries at its ends, escaped punctuation and '.'.
+func requiredLiteral(pattern string) string {
+	pattern = strings.TrimPrefix(pattern, `\b`)
+	pattern = strings.TrimSuffix(pattern, `\b`)
+
+	var best, run []byte
+	endRun := func() {
+		if len(run) > len(best) {
+			best = append(best[:0], run...)
+		}
+		run = run[:0]
+	}
+	for i := 0; i < len(pattern); i++ {
+		c := pattern[i]
+		switch {
+		case c == '\\':
+			// An escaped punctuation byte is literal; an escaped letter or
+			// digit is a class or assertion.
+			if i+1 == len(pattern) || isAlnum(pattern[i+1]) || pattern[i+1] >= utf8.RuneSelf {
+				return ""
+			}
+			i++
+			run = append(run, pattern[i])
+		case c == '.':
+			endRun()
+		case c >= utf8.RuneSelf || strings.IndexByte("[](){}*+?|^$", c) >= 0:
+			return ""
+		default:
+			if 'A' <= c && c <= 'Z' {
+				c += 'a' - 'A'
+			}
+			run = append(run, c)
+		}
+	}
+	endRun()
+	if len(best) < 3 {
+		return ""
+	}
+	return string(best)
+}
+
+func isAlnum(c byte) bool {
+	return 'a' <= c && c <= 'z' || 'A' <= c && c <= 'Z' || '0' <= c && c <= '9'
+}
+
+func isASCII(s string) bool {
+	for i := 0; i < len(s); i++ {
+		if s[i] >= utf8.RuneSelf {
+			return false
+		}
+	}
+	return true
+}
+
 // loadStringFile reads a file of plain string patterns (one per line).
 func loadStringFile(name string) []string {
 	f, err := crowdsecData.Open(name)
@@ -82,14 +181,31 @@ func loadStringFile(name string) []string {
 // bad user agent from the CrowdSec community dataset (600+ patterns).
 func CrowdSecMatchBadUA(rawRequest string) bool {
 	// Extract User-Agent line from raw request
-	for _, line := range strings.Split(rawRequest, "\n") {
-		lower := strings.ToLower(strings.TrimSpace(line))
-		if !strings.HasPrefix(lower, "user-agent:") {
+	for rest := rawRequest; rest != ""; {
+		line := rest
+		if idx := strings.IndexByte(rest, '\n'); idx >= 0 {
+			line, rest = rest[:idx], rest[idx+1:]
+		} else {
+			rest = ""
+		}
+		trimmed := strings.TrimSpace(line)
+		if len(trimmed) < len("user-agent:") || !strings.EqualFold(trimmed[:len("user-agent:")], "user-agent:") {
 			continue
 		}
 		ua := line[len("User-Agent:"):]
-		for _, re := range crowdsecBadUAs {
-			if re.MatchString(ua) {
+		// The literal gate is only exact for ASCII: under (?i) a pattern's
+		// 's' or 'k' also matches 'ſ' or the Kelvin sign, which ToLower
+		// doesn't fold.
+		gate := isASCII(ua)
+		lowerUA := ""
+		if gate {
+			lowerUA = strings.ToLower(ua)
+		}
+		for _, p := range crowdsecBadUAs {
+			if gate && p.literal != "" && !strings.Contains(lowerUA, p.literal) {
+				continue
+			}
+			if p.re.MatchString(ua) {
 				return true
 			}
 		}
@@ -100,36 +216,18 @@ func CrowdSecMatchBadUA(rawRequest string) bool {
 
 // CrowdSecMatchSQLi checks URL-decoded query/path against CrowdSec SQLi patterns.
 func CrowdSecMatchSQLi(searchText string) bool {
-	upper := strings.ToUpper(searchText)
-	for _, pat := range crowdsecSQLiPatterns {
-		if strings.Contains(upper, strings.ToUpper(pat)) {
-			return true
-		}
-	}
-	return false
+	return containsAny(strings.ToUpper(searchText), crowdsecSQLiPatterns)
 }
 
 // CrowdSecMatchXSS checks the request against CrowdSec XSS patterns.
 func CrowdSecMatchXSS(searchText string) bool {
-	upper := strings.ToUpper(searchText)
-	for _, pat := range crowdsecXSSPatterns {
-		if strings.Contains(upper, strings.ToUpper(pat)) {
-			return true
-		}
-	}
-	return false
+	return containsAny(strings.ToUpper(searchText), crowdsecXSSPatterns)
 }
 
 // CrowdSecMatchPathTraversal checks the request path against CrowdSec path
 // traversal patterns.
 func CrowdSecMatchPathTraversal(searchText string) bool {
-	upper := strings.ToUpper(searchText)
-	for _, pat := range crowdsecPathPatterns {
-		if strings.Contains(upper, strings.ToUpper(pat)) {
-			return true
-		}
-	}
-	return false
+	return containsAny(strings.ToUpper(searchText), crowdsecPathPatterns)
 }
 
 // CrowdSecMatchBackdoor checks whether the request path targets a known
@@ -140,35 +238,17 @@ func CrowdSecMatchBackdoor(rawRequest string) bool {
 	if idx := strings.IndexByte(rawRequest, '\n'); idx > 0 {
 		firstLine = rawRequest[:idx]
 	}
-	lower := strings.ToLower(firstLine)
-	for _, backdoor := range crowdsecBackdoorPaths {
-		if strings.Contains(lower, "/"+strings.ToLower(backdoor)) {
-			return true
-		}
-	}
-	return false
+	return containsAny(strings.ToLower(firstLine), crowdsecBackdoorPaths)
 }
 
 // CrowdSecMatchCmdInj checks the request against CrowdSec command injection patterns.
 func CrowdSecMatchCmdInj(searchText string) bool {
-	lower := strings.ToLower(searchText)
-	for _, pat := range crowdsecCmdInjPatterns {
-		if strings.Contains(lower, strings.ToLower(pat)) {
-			return true
-		}
-	}
-	return false
+	return containsAny(strings.ToLower(searchText), crowdsecCmdInjPatterns)
 }
 
 // CrowdSecMatchLog4Shell checks the request against JNDI/Log4Shell and SSTI patterns.
 func CrowdSecMatchLog4Shell(searchText string) bool {
-	lower := strings.ToLower(searchText)
-	for _, pat := range crowdsecLog4ShPatterns {
-		if strings.Contains(lower, strings.ToLower(pat)) {
-			return true
-		}
-	}
-	return false
+	return containsAny(strings.ToLower(searchText), crowdsecLog4ShPatterns)
 }
 
 // CrowdSecPatternCounts returns the number of loaded patterns for logging.
@@ -9,46 +9,82 @@ import (
 	"net/http"
 	"os"
 	"strings"
+	"sync"
 	"time"
 )
 
-var crusoeClient = &http.Client{Timeout: 15 * time.Second}
+// crusoeClient is shared by all Crusoe calls. The default transport keeps only
+// two idle connections per host, so concurrent classifications would keep
+// re-dialling and re-handshaking TLS to the same inference endpoint.
+var crusoeClient = &http.Client{
+	Timeout: 15 * time.Second,
+	Transport: &http.Transport{
+		Proxy:               http.ProxyFromEnvironment,
+		ForceAttemptHTTP2:   true,
+		MaxIdleConns:        64,
+		MaxIdleConnsPerHost: 32,
+		IdleConnTimeout:     90 * time.Second,
+		TLSHandshakeTimeout: 10 * time.Second,
+	},
+}
 
-// CrusoeClassify calls the Crusoe Inference API (OpenAI-compatible) for classification.
-func CrusoeClassify(ctx context.Context, raw, systemPrompt string) *Result {
-	apiURL := os.Getenv("CRUSOE_API_URL")
-	if apiURL == "" {
-		apiURL = "https://hackeurope.crusoecloud.com/v1"
+// crusoeConfig is the Crusoe endpoint configuration, read from the
+// environment once on first use rather than on every classification.
+type crusoeConfig struct {
+	apiURL  string
+	apiKey  string
+	model   string
+	enabled bool
+}
+
+var crusoeEnv = sync.OnceValue(func() crusoeConfig {
+	cfg := crusoeConfig{
+		apiURL: os.Getenv("CRUSOE_API_URL"),
+		apiKey: os.Getenv("CRUSOE_API_KEY"),
+		model:  os.Getenv("CRUSOE_MODEL"),
+	}
+	if cfg.apiURL == "" {
+		cfg.apiURL = "https://hackeurope.crusoecloud.com/v1"
 	}
-	apiKey := os.Getenv("CRUSOE_API_KEY")
-	model := os.Getenv("CRUSOE_MODEL")
-	if model == "" {
-		model = "NVFP4/Qwen3-235B-A22B-Instruct-2507-FP4"
+	if cfg.model == "" {
+		cfg.model = "NVFP4/Qwen3-235B-A22B-Instruct-2507-FP4"
 	}
+	cfg.enabled = cfg.apiKey != "" && cfg.apiKey != "placeholder"
+	return cfg
+})
 
-	if apiKey == "" || apiKey == "placeholder" {
+// CrusoeClassify calls the Crusoe Inference API (OpenAI-compatible) for classification.
+func CrusoeClassify(ctx context.Context, raw, systemPrompt string) *Result {
+	cfg := crusoeEnv()
+	if !cfg.enabled {
 		return &Result{
 			Classification: "SUSPICIOUS",
 			Confidence:     0.5,
+			failed:         true,
 			Reason:         "Crusoe API key not configured",
 			Classifier:     "crusoe",
 		}
 	}
 
+	if err := crusoeLimiter.acquire(ctx); err != nil {
+		return &Result{
+			Classification: "SUSPICIOUS",
+			Confidence:     0.5,
+			failed:         true,
+			Reason:         "Crusoe call cancelled while queued",
+			Classifier:     "crusoe",
+		}
+	}
+	outcome := callAborted
+	var backoff time.Duration
+	defer func() { crusoeLimiter.release(outcome, backoff) }()
+
 	start := time.Now()
 
-	body, _ := json.Marshal(map[string]any{
-		"model": model,
-		"messages": []map[string]string{
-			{"role": "system", "content": systemPrompt},
-			{"role": "user", "content": raw},
-		},
-		"temperature": 0.0,
-		"max_tokens":  200,
-	})
+	body, _ := json.Marshal(newChatRequest(cfg.model, systemPrompt, raw, 200))
 
-	req, _ := http.NewRequestWithContext(ctx, "POST", apiURL+"/chat/completions", bytes.NewReader(body))
-	req.Header.Set("Authorization", "Bearer "+apiKey)
+	req, _ := http.NewRequestWithContext(ctx, "POST", cfg.apiURL+"/chat/completions", bytes.NewReader(body))
+	req.Header.Set("Authorization", "Bearer "+cfg.apiKey)
 	req.Header.Set("Content-Type", "application/json")
 
 	resp, err := crusoeClient.Do(req)
@@ -57,6 +93,7 @@ func CrusoeClassify(ctx context.Context, raw, systemPrompt string) *Result {
 		return &Result{
 			Classification: "SUSPICIOUS",
 			Confidence:     0.5,
+			failed:         true,
 			Reason:         fmt.Sprintf("Crusoe connection error: %v", err),
 			Classifier:     "crusoe",
 			ResponseTimeMs: elapsed,
@@ -65,9 +102,13 @@ func CrusoeClassify(ctx context.Context, raw, systemPrompt string) *Result {
 	defer resp.Body.Close()
 
 	if resp.StatusCode != http.StatusOK {
+		if isThrottleStatus(resp.StatusCode) {
+			outcome, backoff = callThrottled, retryAfterHeader(resp.Header)
+		}
 		return &Result{
 			Classification: "SUSPICIOUS",
 			Confidence:     0.5,
+			failed:         true,
 			Reason:         fmt.Sprintf("Crusoe API error: %d", resp.StatusCode),
 			Classifier:     "crusoe",
 			ResponseTimeMs: elapsed,
@@ -79,23 +120,20 @@ func CrusoeClassify(ctx context.Context, raw, systemPrompt string) *Result {
 		return &Result{
 			Classification: "SUSPICIOUS",
 			Confidence:     0.5,
+			failed:         true,
 			Reason:         "Failed to read Crusoe response",
 			Classifier:     "crusoe",
 			ResponseTimeMs: elapsed,
 		}
 	}
+	outcome = callOK
 
-	var chatResp struct {
-		Choices []struct {
-			Message struct {
-				Content string `json:"content"`
-			} `json:"message"`
-		} `json:"choices"`
-	}
+	var chatResp chatResponse
 	if err := json.Unmarshal(data, &chatResp); err != nil || len(chatResp.Choices) == 0 {
 		return &Result{
 			Classification: "SUSPICIOUS",
 			Confidence:     0.5,
+			failed:         true,
 			Reason:         "Failed to parse Crusoe response",
 			Classifier:     "crusoe",
 			ResponseTimeMs: elapsed,
@@ -112,31 +150,15 @@ func CrusoeClassify(ctx context.Context, raw, systemPrompt string) *Result {
 // CrusoeGenerate calls the Crusoe Inference API and returns the raw text response.
 // Used by agents that need freeform LLM output (not classifier-shaped JSON).
 func CrusoeGenerate(ctx context.Context, userPrompt, systemPrompt string) (string, error) {
-	apiURL := os.Getenv("CRUSOE_API_URL")
-	if apiURL == "" {
-		apiURL = "https://hackeurope.crusoecloud.com/v1"
-	}
-	apiKey := os.Getenv("CRUSOE_API_KEY")
-	model := os.Getenv("CRUSOE_MODEL")
-	if model == "" {
-		model = "NVFP4/Qwen3-235B-A22B-Instruct-2507-FP4"
-	}
-	if apiKey == "" || apiKey == "placeholder" {
+	cfg := crusoeEnv()
+	if !cfg.enabled {
 		return "", fmt.Errorf("Crusoe API key not configured")
 	}
 
-	body, _ := json.Marshal(map[string]any{
-		"model": model,
-		"messages": []map[string]string{
-			{"role": "system", "content": systemPrompt},
-			{"role": "user", "content": userPrompt},
-		},
-		"temperature": 0.0,
-		"max_tokens":  500,
-	})
+	body, _ := json.Marshal(newChatRequest(cfg.model, systemPrompt, userPrompt, 500))
 
-	req, _ := http.NewRequestWithContext(ctx, "POST", apiURL+"/chat/completions", bytes.NewReader(body))
-	req.Header.Set("Authorization", "Bearer "+apiKey)
+	req, _ := http.NewRequestWithContext(ctx, "POST", cfg.apiURL+"/chat/completions", bytes.NewReader(body))
+	req.Header.Set("Authorization", "Bearer "+cfg.apiKey)
 	req.Header.Set("Content-Type", "application/json")
 
 	resp, err := crusoeClient.Do(req)
@@ -154,13 +176,7 @@ func CrusoeGenerate(ctx context.Context, userPrompt, systemPrompt string) (strin
 		return "", fmt.Errorf("failed to read Crusoe response: %w", err)
 	}
 
-	var chatResp struct {
-		Choices []struct {
-			Message struct {
-				Content string `json:"content"`
-			} `json:"message"`
-		} `json:"choices"`
-	}
+	var chatResp chatResponse
 	if err := json.Unmarshal(data, &chatResp); err != nil || len(chatResp.Choices) == 0 {
 		return "", fmt.Errorf("failed to parse Crusoe response")
 	}
@@ -168,24 +184,52 @@ func CrusoeGenerate(ctx context.Context, userPrompt, systemPrompt string) (strin
 	return strings.TrimSpace(chatResp.Choices[0].Message.Content), nil
 }
 
+// chatRequest is a Crusoe chat completions request. It and chatResponse are
+// typed so encoding and decoding skip the reflection over map[string]any.
+type chatRequest struct {
+	Model       string        `json:"model"`
+	Messages    []chatMessage `json:"messages"`
+	Temperature float64       `json:"temperature"`
+	MaxTokens   int           `json:"max_tokens"`
+}
+
+type chatMessage struct {
+	Role    string `json:"role"`
+	Content string `json:"content"`
+}
+
+type chatResponse struct {
+	Choices []struct {
+		Message chatMessage `json:"message"`
+	} `json:"choices"`
+}
+
+// newChatRequest builds a deterministic (temperature 0) request for model.
+func newChatRequest(model, systemPrompt, userPrompt string, maxTokens int) chatRequest {
+	return chatRequest{
+		Model: model,
+		Messages: []chatMessage{
+			{Role: "system", Content: systemPrompt},
+			{Role: "user", Content: userPrompt},
+		},
+		MaxTokens: maxTokens,
+	}
+}
+
 // parseJSONResult extracts a Result from a JSON string, handling LLM output
-// that may contain extra text around the JSON.
+// that may contain extra text around the JSON. It decodes the first object
+// in one pass and ignores whatever follows it.
 func parseJSONResult(content string) *Result {
-	var r Result
-	if err := json.Unmarshal([]byte(content), &r); err == nil {
-		return &r
-	}
-	// Try extracting JSON from surrounding text
-	start := strings.Index(content, "{")
-	end := strings.LastIndex(content, "}")
-	if start >= 0 && end > start {
-		if err := json.Unmarshal([]byte(content[start:end+1]), &r); err == nil {
+	if start := strings.IndexByte(content, '{'); start >= 0 {
+		var r Result
+		if err := json.NewDecoder(strings.NewReader(content[start:])).Decode(&r); err == nil {
 			return &r
 		}
 	}
 	return &Result{
 		Classification: "SUSPICIOUS",
 		Confidence:     0.5,
+		failed:         true,
 		Reason:         "Failed to parse classifier response",
 	}
 }
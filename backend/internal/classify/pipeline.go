@@ -2,32 +2,171 @@ package classify
 
 import (
 	"context"
+	"errors"
 	"log/slog"
+	"sync"
+	"time"
 
+	"github.com/jackc/pgx/v5"
 	"github.com/veil-waf/veil-go/internal/db"
 )
 
 // Pipeline orchestrates the multi-stage classification cascade:
 // regex → Crusoe LLM → Claude deep analysis.
 type Pipeline struct {
-	db     *db.DB
-	logger *slog.Logger
+	db       *db.DB
+	logger   *slog.Logger
+	cache    *resultCache
+	inflight *inflightGroup
+
+	rulesMu   sync.RWMutex
+	rules     map[int]cachedRules // site ID -> current rules
+	rulesGen  uint64              // bumped by InvalidateRules; guarded by rulesMu
+	rulesLoad map[int]*rulesCall  // in-flight refills by site ID; guarded by rulesMu
+}
+
+// rulesCacheTTL bounds how stale the rules used for classification can be.
+// The agent loop (the only writer of rules) invalidates the cache when it
+// writes a new version, so this only matters for rules changed outside this
+// process, e.g. by hand in psql.
+const rulesCacheTTL = 30 * time.Second
+
+type cachedRules struct {
+	rules   *db.Rules // nil means "no rules row, use defaults"
+	expires time.Time
+}
+
+// rulesCall is a rules refill in progress; done is closed once rules is set.
+type rulesCall struct {
+	done  chan struct{}
+	rules *db.Rules
 }
 
 // NewPipeline creates a new classification pipeline.
 func NewPipeline(database *db.DB, logger *slog.Logger) *Pipeline {
-	return &Pipeline{db: database, logger: logger}
+	return &Pipeline{
+		db:        database,
+		logger:    logger,
+		cache:     newResultCache(),
+		inflight:  newInflightGroup(),
+		rules:     make(map[int]cachedRules),
+		rulesLoad: make(map[int]*rulesCall),
+	}
+}
+
+// regexFinalConfidence is the confidence at which a MALICIOUS regex verdict
+// ends the cascade without consulting an LLM.
+const regexFinalConfidence = 0.85
+
+// NeedsLLM reports whether the cascade would go on to the LLM stages after
+// regex produced r. SAFE and high-confidence MALICIOUS verdicts are final.
+func NeedsLLM(r *Result) bool {
+	switch r.Classification {
+	case "SAFE":
+		return false
+	case "MALICIOUS":
+		return r.Confidence < regexFinalConfidence
+	}
+	return true
 }
 
 // Classify runs the full classification pipeline on a raw HTTP request string.
 // It fetches rules for the given siteID to pass as system prompts to LLMs.
 func (p *Pipeline) Classify(ctx context.Context, siteID int, rawRequest string) *Result {
+	return p.ClassifyWithRules(ctx, rawRequest, p.currentRules(ctx, siteID))
+}
+
+// ClassifyScreened is Classify for a request whose regex verdict the caller
+// already has (the proxy runs the regex stage inline to decide on blocking),
+// so stage 0 isn't run a second time.
+func (p *Pipeline) ClassifyScreened(ctx context.Context, siteID int, rawRequest string, regexResult *Result) *Result {
+	return p.classifyCached(ctx, rawRequest, p.currentRules(ctx, siteID), regexResult)
+}
+
+// currentRules returns the site's current rules, served from a short-lived
+// in-process cache so the proxy path doesn't query Postgres per request.
+func (p *Pipeline) currentRules(ctx context.Context, siteID int) *db.Rules {
+	if rules, ok := p.cachedRulesFor(siteID); ok {
+		return rules
+	}
+
+	// Single-flight the refill per site: when an entry expires under load,
+	// one caller queries while the rest for that site wait for its result.
+	// Other sites' refills don't queue behind it.
+	p.rulesMu.Lock()
+	if e, ok := p.rules[siteID]; ok && time.Now().Before(e.expires) {
+		p.rulesMu.Unlock()
+		return e.rules
+	}
+	if c, ok := p.rulesLoad[siteID]; ok {
+		p.rulesMu.Unlock()
+		<-c.done
+		return c.rules
+	}
+	c := &rulesCall{done: make(chan struct{})}
+	p.rulesLoad[siteID] = c
+	gen := p.rulesGen
+	p.rulesMu.Unlock()
+
+	c.rules = p.loadRules(ctx, siteID, gen)
+	p.rulesMu.Lock()
+	if p.rulesLoad[siteID] == c {
+		delete(p.rulesLoad, siteID)
+	}
+	p.rulesMu.Unlock()
+	close(c.done)
+	return c.rules
+}
+
+// loadRules reads siteID's rules from the database and caches them, unless
+// the cache was invalidated since generation gen.
+func (p *Pipeline) loadRules(ctx context.Context, siteID int, gen uint64) *db.Rules {
 	rules, err := p.db.GetCurrentRules(ctx, siteID)
-	if err != nil {
+	switch {
+	case errors.Is(err, pgx.ErrNoRows):
 		p.logger.Debug("no rules found for site, using defaults", "site_id", siteID)
+		rules = nil
+	case err != nil:
+		// A transient failure (pool timeout, failover) says nothing about the
+		// site's rules, so don't cache it: keep using the last rules seen, even
+		// if expired, or the defaults, and retry on the next request.
+		p.logger.Warn("failed to load rules", "site_id", siteID, "err", err)
+		p.rulesMu.RLock()
+		rules = p.rules[siteID].rules
+		p.rulesMu.RUnlock()
+		return rules
+	}
+	p.rulesMu.Lock()
+	// Don't cache a read that raced with an invalidation; it may predate the
+	// newly written version.
+	if p.rulesGen == gen {
+		p.rules[siteID] = cachedRules{rules: rules, expires: time.Now().Add(rulesCacheTTL)}
 	}
+	p.rulesMu.Unlock()
+	return rules
+}
 
-	return p.ClassifyWithRules(ctx, rawRequest, rules)
+// cachedRulesFor returns the live cache entry for siteID, if any.
+func (p *Pipeline) cachedRulesFor(siteID int) (*db.Rules, bool) {
+	p.rulesMu.RLock()
+	defer p.rulesMu.RUnlock()
+	e, ok := p.rules[siteID]
+	if ok && time.Now().Before(e.expires) {
+		return e.rules, true
+	}
+	return nil, false
+}
+
+// InvalidateRules drops all cached rules so the next classification picks up
+// a freshly written rules version.
+func (p *Pipeline) InvalidateRules() {
+	p.rulesMu.Lock()
+	clear(p.rules)
+	// Refills already in flight may return the old version; later callers
+	// start their own instead of waiting on those.
+	clear(p.rulesLoad)
+	p.rulesGen++
+	p.rulesMu.Unlock()
 }
 
 // ClassifyWithRules runs classification with explicit rules (can be nil for defaults).
@@ -36,7 +175,16 @@ func (p *Pipeline) Classify(ctx context.Context, siteID int, rawRequest string)
 //	Stage 0: Regex (instant)  → SAFE=done, MALICIOUS=block, SUSPICIOUS=continue
 //	Stage 1: Crusoe fast LLM  → only if regex was SUSPICIOUS
 //	Stage 2: Claude deep LLM  → only if Stage 1 says SUSPICIOUS/MALICIOUS
+//	                            (run concurrently with Stage 1, cancelled if unused)
+//
+// Verdicts are cached per (rules, raw request) for a short TTL so
+// repeated identical requests bypass the LLM stages entirely, and concurrent
+// identical requests are coalesced into a single pipeline run.
 func (p *Pipeline) ClassifyWithRules(ctx context.Context, rawRequest string, rules *db.Rules) *Result {
+	return p.classifyCached(ctx, rawRequest, rules, nil)
+}
+
+func (p *Pipeline) classifyCached(ctx context.Context, rawRequest string, rules *db.Rules, regexResult *Result) *Result {
 	if rules == nil {
 		rules = &db.Rules{
 			Version:      1,
@@ -45,20 +193,44 @@ func (p *Pipeline) ClassifyWithRules(ctx context.Context, rawRequest string, rul
 		}
 	}
 
-	// Stage 0: Regex classifier (always runs, instant)
-	regexResult := RegexClassify(rawRequest)
-	regexResult.RulesVersion = rules.Version
+	key := resultCacheKey(rules, rawRequest)
+	if cached := p.cache.get(key); cached != nil {
+		return cached
+	}
+	// Identical requests already being classified share that in-flight result.
+	return p.inflight.do(key, func() *Result {
+		result, llmVerdict := p.classify(ctx, rawRequest, rules, regexResult)
+		// Only cache verdicts the LLM stages actually reached. One that fell
+		// back to regex because a stage failed (API error, throttling, missing
+		// keys) would otherwise be served for the whole TTL after the outage.
+		if llmVerdict {
+			p.cache.put(key, result)
+		}
+		return result
+	})
+}
 
-	// Fast path: regex says SAFE with confidence → done, no LLM needed.
-	// This is the common case for normal traffic (static assets, standard pages).
-	if regexResult.Classification == "SAFE" {
-		return regexResult
+// classify runs the cascade. llmVerdict reports that the LLM stages were
+// consulted and every one that was needed answered; it is false for regex
+// fast paths and for verdicts that fell back to regex after a stage failed.
+func (p *Pipeline) classify(ctx context.Context, rawRequest string, rules *db.Rules, screened *Result) (result *Result, llmVerdict bool) {
+	// Stage 0: Regex classifier (instant). Reuse the caller's verdict if given;
+	// copy it since the caller may still hold the original.
+	var regexResult *Result
+	if screened != nil {
+		r := *screened
+		regexResult = &r
+	} else {
+		regexResult = RegexClassify(rawRequest)
 	}
+	regexResult.RulesVersion = rules.Version
 
-	// Fast path: regex says MALICIOUS with high confidence → block immediately.
-	if regexResult.Classification == "MALICIOUS" && regexResult.Confidence >= 0.85 {
-		regexResult.Blocked = true
-		return regexResult
+	// Fast paths: regex says SAFE (the common case for normal traffic: static
+	// assets, standard pages) → done; MALICIOUS with high confidence → block
+	// immediately. Neither needs an LLM.
+	if !NeedsLLM(regexResult) {
+		regexResult.Blocked = regexResult.Classification == "MALICIOUS"
+		return regexResult, false
 	}
 
 	// Stage 1: Crusoe fast check (only if regex found something suspicious or
@@ -67,12 +239,25 @@ func (p *Pipeline) ClassifyWithRules(ctx context.Context, rawRequest string, rul
 	classification := regexResult.Classification
 	confidence := regexResult.Confidence
 
+	// Each request gets its own LLM calls. Packing several requests into one
+	// prompt would cut call counts, but the requests are attacker-controlled
+	// text, and one of them could then steer the verdicts of the others.
+	//
+	// Crusoe rarely clears a request regex flagged, so Stage 2 is usually
+	// needed too: start Claude alongside Crusoe and cancel it if Crusoe's
+	// verdict ends the cascade. Latency is max(crusoe, claude), not the sum.
+	claudeCtx, cancelClaude := context.WithCancel(ctx)
+	defer cancelClaude()
+	claudeDone := make(chan *Result, 1)
+	go func() {
+		claudeDone <- ClaudeClassify(claudeCtx, rawRequest, rules.ClaudePrompt)
+	}()
+
 	crusoeResult := CrusoeClassify(ctx, rawRequest, rules.CrusoePrompt)
 
 	// Only accept Crusoe's verdict if it actually succeeded (not a fallback).
-	// Crusoe fallback on API errors returns Confidence == 0.5 exactly — ignore those.
-	crusoeSucceeded := crusoeResult.Confidence != 0.5 || crusoeResult.Classification == "SAFE"
-	if crusoeSucceeded {
+	llmVerdict = !crusoeResult.failed
+	if llmVerdict {
 		if crusoeResult.Classification == "MALICIOUS" {
 			classification = crusoeResult.Classification
 			finalResult = crusoeResult
@@ -92,7 +277,8 @@ func (p *Pipeline) ClassifyWithRules(ctx context.Context, rawRequest string, rul
 
 	// Stage 2: Claude deep analysis (only if still suspicious or malicious)
 	if classification == "SUSPICIOUS" || classification == "MALICIOUS" {
-		claudeResult := ClaudeClassify(ctx, rawRequest, rules.ClaudePrompt)
+		claudeResult := <-claudeDone
+		llmVerdict = llmVerdict && !claudeResult.failed
 		if claudeResult.Classification == "MALICIOUS" {
 			classification = claudeResult.Classification
 			finalResult = claudeResult
@@ -115,7 +301,7 @@ func (p *Pipeline) ClassifyWithRules(ctx context.Context, rawRequest string, rul
 		Reason:         finalResult.Reason,
 		ResponseTimeMs: finalResult.ResponseTimeMs,
 		RulesVersion:   rules.Version,
-	}
+	}, llmVerdict
 }
 
 const defaultCrusoePrompt = `You are a web application firewall. Analyze the HTTP request and respond with a JSON object:
@@ -0,0 +1,212 @@
+package classify
+
+import (
+	"regexp"
+	"regexp/syntax"
+	"strings"
+	"unicode/utf8"
+)
+
+// maxGateStrings bounds how many alternatives a gate may hold before it
+// stops being cheaper than just running the regex.
+const maxGateStrings = 16
+
+// requiredStrings derives a gate for pattern: a set of lowercase strings at
+// least one of which appears, case-insensitively, in any ASCII text the
+// pattern matches. It returns nil when no useful gate can be derived, in
+// which case the pattern must always be run.
+func requiredStrings(pattern string) []string {
+	re, err := syntax.Parse(pattern, syntax.Perl)
+	if err != nil {
+		return nil
+	}
+	return required(re.Simplify())
+}
+
+func required(re *syntax.Regexp) []string {
+	switch re.Op {
+	case syntax.OpLiteral:
+		for _, r := range re.Rune {
+			if r >= utf8.RuneSelf {
+				return nil
+			}
+		}
+		return []string{strings.ToLower(string(re.Rune))}
+
+	case syntax.OpCharClass:
+		var set []string
+		for i := 0; i+1 < len(re.Rune); i += 2 {
+			lo, hi := re.Rune[i], re.Rune[i+1]
+			if hi >= utf8.RuneSelf || int(hi-lo) >= maxGateStrings {
+				return nil
+			}
+			for r := lo; r <= hi; r++ {
+				set = appendUnique(set, strings.ToLower(string(r)))
+			}
+		}
+		if len(set) == 0 || len(set) > maxGateStrings {
+			return nil
+		}
+		return set
+
+	case syntax.OpCapture, syntax.OpPlus:
+		return required(re.Sub[0])
+
+	case syntax.OpRepeat:
+		if re.Min < 1 {
+			return nil
+		}
+		return required(re.Sub[0])
+
+	case syntax.OpConcat:
+		// Every part must match, so any part's gate is a gate for the whole;
+		// keep the most selective one.
+		var best []string
+		for _, sub := range re.Sub {
+			if set := required(sub); set != nil && betterGate(set, best) {
+				best = set
+			}
+		}
+		return best
+
+	case syntax.OpAlternate:
+		// Some branch must match, so the gate is the union of all branches'.
+		var set []string
+		for _, sub := range re.Sub {
+			s := required(sub)
+			if s == nil {
+				return nil
+			}
+			for _, str := range s {
+				set = appendUnique(set, str)
+			}
+		}
+		if len(set) > maxGateStrings {
+			return nil
+		}
+		return set
+	}
+	// Empty-width assertions, any-char, optional and starred parts constrain
+	// nothing.
+	return nil
+}
+
+// betterGate reports whether a is more selective than b: its shortest string
+// is longer, or as long with fewer alternatives.
+func betterGate(a, b []string) bool {
+	if b == nil {
+		return true
+	}
+	if ma, mb := shortest(a), shortest(b); ma != mb {
+		return ma > mb
+	}
+	return len(a) < len(b)
+}
+
+func shortest(set []string) int {
+	n := -1
+	for _, s := range set {
+		if n < 0 || len(s) < n {
+			n = len(s)
+		}
+	}
+	return n
+}
+
+func appendUnique(set []string, s string) []string {
+	for _, have := range set {
+		if have == s {
+			return set
+		}
+	}
+	return append(set, s)
+}
+
+// mayMatch reports whether lowered text passes gate. A nil gate always
+// passes.
+func mayMatch(lowered string, gate []string) bool {
+	if gate == nil {
+		return true
+	}
+	for _, s := range gate {
+		if strings.Contains(lowered, s) {
+			return true
+		}
+	}
+	return false
+}
+
+// lowerPattern rewrites a case-insensitive pattern into a case-sensitive one
+// that matches lowercased ASCII text exactly where the original matches the
+// text itself. Folded literals are cheaper to match, and a literal prefix
+// lets the matcher skip ahead with a substring search. It returns nil when
+// some part of the pattern is case-sensitive, since lowering the text would
+// change what that part matches.
+func lowerPattern(pattern string) *regexp.Regexp {
+	re, err := syntax.Parse(pattern, syntax.Perl)
+	if err != nil || !unfold(re) {
+		return nil
+	}
+	lowered, err := regexp.Compile(re.String())
+	if err != nil {
+		return nil
+	}
+	return lowered
+}
+
+// unfold clears case folding from re in place, lowercasing folded literals.
+// It reports false if re matches some ASCII letter in only one case.
+func unfold(re *syntax.Regexp) bool {
+	switch re.Op {
+	case syntax.OpLiteral:
+		fold := re.Flags&syntax.FoldCase != 0
+		for i, r := range re.Rune {
+			switch {
+			case r >= utf8.RuneSelf:
+				if fold {
+					return false
+				}
+			case fold:
+				re.Rune[i] = toLowerASCII(r)
+			case isASCIILetter(r):
+				return false
+			}
+		}
+		re.Flags &^= syntax.FoldCase
+
+	case syntax.OpCharClass:
+		for i := 0; i+1 < len(re.Rune); i += 2 {
+			for r := re.Rune[i]; r <= re.Rune[i+1] && r < utf8.RuneSelf; r++ {
+				if isASCIILetter(r) && !inClass(re.Rune, r^0x20) {
+					return false
+				}
+			}
+		}
+	}
+	for _, sub := range re.Sub {
+		if !unfold(sub) {
+			return false
+		}
+	}
+	return true
+}
+
+func inClass(class []rune, r rune) bool {
+	for i := 0; i+1 < len(class); i += 2 {
+		if class[i] <= r && r <= class[i+1] {
+			return true
+		}
+	}
+	return false
+}
+
+func isASCIILetter(r rune) bool {
+	return 'a' <= r && r <= 'z' || 'A' <= r && r <= 'Z'
+}
+
+func toLowerASCII(r rune) rune {
+	if 'A' <= r && r <= 'Z' {
+		return r + 'a' - 'A'
+	}
+	return r
+}
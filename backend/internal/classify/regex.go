@@ -1,6 +1,7 @@
 package classify
 
 import (
+	"crypto/sha256"
 	"fmt"
 	"net/url"
 	"regexp"
@@ -14,6 +15,57 @@ type attackRule struct {
 	Patterns   []*regexp.Regexp
 	BaseConf   float64
 	HumanName  string
+	// Gates[i] is requiredStrings for Patterns[i]: a cheap substring check
+	// that rules the pattern out for most requests without running it.
+	Gates [][]string
+	// Lowered[i] is Patterns[i] rewritten without case folding, to be run
+	// on lowercased text, or nil if the pattern can't be rewritten.
+	Lowered []*regexp.Regexp
+}
+
+// scanForm is one form of the request searched by regexScan: the raw text or
+// one of its decodings. lowered is text lowercased, or "" if text isn't ASCII
+// and neither the gates nor the lowered patterns can be used.
+type scanForm struct {
+	text, lowered string
+}
+
+func newScanForm(text string) scanForm {
+	// Pattern gates compare against lowercased text, which only agrees with
+	// (?i) matching for ASCII; other text runs every pattern.
+	f := scanForm{text: text}
+	if isASCII(text) {
+		f.lowered = strings.ToLower(text)
+	}
+	return f
+}
+
+// matches returns how many of the rule's patterns match at least one of the
+// forms. Each form is matched on its own, so no match spans two of them.
+func (r *attackRule) matches(forms []scanForm) int {
+	hits := 0
+	for i, pat := range r.Patterns {
+		for _, f := range forms {
+			if r.matchForm(i, pat, f) {
+				hits++
+				break
+			}
+		}
+	}
+	return hits
+}
+
+func (r *attackRule) matchForm(i int, pat *regexp.Regexp, f scanForm) bool {
+	switch {
+	case f.lowered == "":
+		return pat.MatchString(f.text)
+	case !mayMatch(f.lowered, r.Gates[i]):
+		return false
+	case r.Lowered[i] != nil:
+		return r.Lowered[i].MatchString(f.lowered)
+	default:
+		return pat.MatchString(f.text)
+	}
 }
 
 var rules []attackRule
@@ -232,6 +284,21 @@ func init() {
 			),
 		},
 	}
+
+	gate(scannerRules)
+	gate(rules)
+}
+
+// gate derives each rule's per-pattern gates and lowered patterns.
+func gate(rules []attackRule) {
+	for i := range rules {
+		rules[i].Gates = make([][]string, len(rules[i].Patterns))
+		rules[i].Lowered = make([]*regexp.Regexp, len(rules[i].Patterns))
+		for j, p := range rules[i].Patterns {
+			rules[i].Gates[j] = requiredStrings(p.String())
+			rules[i].Lowered[j] = lowerPattern(p.String())
+		}
+	}
 }
 
 func compile(patterns ...string) []*regexp.Regexp {
@@ -242,10 +309,26 @@ func compile(patterns ...string) []*regexp.Regexp {
 	return out
 }
 
+// regexResults memoizes RegexClassify by a hash of the raw request. Scanners
+// and fuzzers replay identical payloads, and a hit replaces the URL decoding
+// and the full pattern scan with a map lookup.
+var regexResults = newResultCache()
+
 // RegexClassify runs regex-based classification on a raw request string.
 // Order: static-asset fast-path → attack patterns → scanner patterns → SAFE.
 func RegexClassify(raw string) *Result {
 	start := time.Now()
+	key := cacheKey(sha256.Sum256([]byte(raw)))
+	if r := regexResults.get(key); r != nil {
+		r.ResponseTimeMs = float64(time.Since(start).Microseconds()) / 1000.0
+		return r
+	}
+	r := regexScan(raw, start)
+	regexResults.put(key, r)
+	return r
+}
+
+func regexScan(raw string, start time.Time) *Result {
 
 	// Fast-path: static assets are always safe — no further checks.
 	firstLine := raw
@@ -264,10 +347,21 @@ func RegexClassify(raw string) *Result {
 		}
 	}
 
-	// Double-decode for evasion detection
-	decoded, _ := url.QueryUnescape(raw)
-	decoded2, _ := url.QueryUnescape(decoded)
-	searchText := strings.Join([]string{raw, decoded, decoded2}, " ")
+	// Double-decode for evasion detection. Only '%' and '+' change under
+	// QueryUnescape, so text without them is its own decoding, and each
+	// distinct form is searched once.
+	forms := []scanForm{newScanForm(raw)}
+	if strings.ContainsAny(raw, "%+") {
+		decoded, _ := url.QueryUnescape(raw)
+		if decoded != raw {
+			forms = append(forms, newScanForm(decoded))
+		}
+		if strings.ContainsAny(decoded, "%+") {
+			if decoded2, _ := url.QueryUnescape(decoded); decoded2 != decoded {
+				forms = append(forms, newScanForm(decoded2))
+			}
+		}
+	}
 
 	type match struct {
 		category  string
@@ -279,13 +373,9 @@ func RegexClassify(raw string) *Result {
 	var matches []match
 
 	// Check attack patterns (result in MALICIOUS classification)
-	for _, rule := range rules {
-		hits := 0
-		for _, pat := range rule.Patterns {
-			if pat.MatchString(searchText) {
-				hits++
-			}
-		}
+	for i := range rules {
+		rule := &rules[i]
+		hits := rule.matches(forms)
 		if hits > 0 {
 			conf := rule.BaseConf + float64(hits-1)*0.03
 			if conf > 0.99 {
@@ -296,13 +386,9 @@ func RegexClassify(raw string) *Result {
 	}
 
 	// Check scanner / recon patterns (result in SUSPICIOUS classification)
-	for _, rule := range scannerRules {
-		hits := 0
-		for _, pat := range rule.Patterns {
-			if pat.MatchString(searchText) {
-				hits++
-			}
-		}
+	for i := range scannerRules {
+		rule := &scannerRules[i]
+		hits := rule.matches(forms)
 		if hits > 0 {
 			conf := rule.BaseConf + float64(hits-1)*0.03
 			if conf > 0.99 {
@@ -321,20 +407,31 @@ func RegexClassify(raw string) *Result {
 		}
 	}
 	if !hasAttackMatch {
+		// The CrowdSec string sets are pre-folded; fold each form once for all of them.
+		upper := make([]string, len(forms))
+		lower := make([]string, len(forms))
+		for i, f := range forms {
+			upper[i] = strings.ToUpper(f.text)
+			lower[i] = f.lowered
+			if lower[i] == "" {
+				lower[i] = strings.ToLower(f.text)
+			}
+		}
+
 		// CrowdSec bad user-agent database (600+ known scanners/bots)
 		if CrowdSecMatchBadUA(raw) {
 			matches = append(matches, match{"bad_user_agent", 0.87, 1, "Known malicious bot (CrowdSec)", true})
 		}
 		// CrowdSec SQLi probe patterns
-		if CrowdSecMatchSQLi(searchText) {
+		if anyContainsAny(upper, crowdsecSQLiPatterns) {
 			matches = append(matches, match{"sqli", 0.90, 1, "SQL injection probe (CrowdSec)", false})
 		}
 		// CrowdSec XSS probe patterns
-		if CrowdSecMatchXSS(searchText) {
+		if anyContainsAny(upper, crowdsecXSSPatterns) {
 			matches = append(matches, match{"xss", 0.88, 1, "XSS probe (CrowdSec)", false})
 		}
 		// CrowdSec path traversal patterns
-		if CrowdSecMatchPathTraversal(searchText) {
+		if anyContainsAny(upper, crowdsecPathPatterns) {
 			matches = append(matches, match{"path_traversal", 0.88, 1, "Path traversal probe (CrowdSec)", false})
 		}
 		// CrowdSec known backdoor/webshell filenames (208 known paths)
@@ -342,11 +439,11 @@ func RegexClassify(raw string) *Result {
 			matches = append(matches, match{"backdoor", 0.93, 1, "Known webshell/backdoor path (CrowdSec)", false})
 		}
 		// CrowdSec command injection patterns
-		if CrowdSecMatchCmdInj(searchText) {
+		if anyContainsAny(lower, crowdsecCmdInjPatterns) {
 			matches = append(matches, match{"command_injection", 0.89, 1, "Command injection probe (CrowdSec)", false})
 		}
 		// CrowdSec JNDI/Log4Shell + SSTI patterns
-		if CrowdSecMatchLog4Shell(searchText) {
+		if anyContainsAny(lower, crowdsecLog4ShPatterns) {
 			matches = append(matches, match{"jndi_injection", 0.93, 1, "JNDI/Log4Shell or SSTI attack (CrowdSec)", false})
 		}
 	}
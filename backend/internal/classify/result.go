@@ -10,4 +10,9 @@ type Result struct {
 	Reason         string  `json:"reason"`
 	ResponseTimeMs float64 `json:"response_time_ms,omitempty"`
 	RulesVersion   int     `json:"rules_version,omitempty"`
+
+	// failed marks an LLM classifier's fallback verdict (API error,
+	// throttling, missing credentials, unparseable reply) as opposed to an
+	// answer from the model.
+	failed bool
 }
@@ -7,6 +7,7 @@ import (
 	"fmt"
 	"log/slog"
 	"os"
+	"strconv"
 	"time"
 
 	"github.com/jackc/pgx/v5"
@@ -21,7 +22,11 @@ var migrations embed.FS
 
 // DB wraps a pgx connection pool and provides CRUD methods for the Veil WAF.
 type DB struct {
-	Pool   *pgxpool.Pool
+	Pool *pgxpool.Pool
+	// Read serves dashboard/analytics reads that tolerate replication lag.
+	// It is a separate pool on DATABASE_READ_URL (e.g. a streaming replica)
+	// when set, and otherwise the same pool as Pool.
+	Read   *pgxpool.Pool
 	logger *slog.Logger
 }
 
@@ -36,8 +41,10 @@ func Connect(ctx context.Context, logger *slog.Logger) (*DB, error) {
 	if err != nil {
 		return nil, fmt.Errorf("parse dsn: %w", err)
 	}
-	config.MaxConns = 20
-	config.MinConns = 2
+	// Every proxied request touches the pool (IP checks, request log), so keep
+	// a few connections warm and let deployments size the pool to their load.
+	config.MaxConns = envInt32("DB_MAX_CONNS", 20)
+	config.MinConns = min(envInt32("DB_MIN_CONNS", 4), config.MaxConns)
 	config.MaxConnLifetime = 30 * time.Minute
 	config.MaxConnIdleTime = 5 * time.Minute
 
@@ -50,14 +57,46 @@ func Connect(ctx context.Context, logger *slog.Logger) (*DB, error) {
 		return nil, fmt.Errorf("ping: %w", err)
 	}
 
-	db := &DB{Pool: pool, logger: logger}
+	db := &DB{Pool: pool, Read: pool, logger: logger}
 	if err := db.Migrate(ctx); err != nil {
 		return nil, fmt.Errorf("migrate: %w", err)
 	}
 
+	// Optional read pool: keeps heavy dashboard scans off the primary that
+	// the proxy hot path (IP checks, request log writes) depends on.
+	if readDSN := os.Getenv("DATABASE_READ_URL"); readDSN != "" {
+		readConfig, err := pgxpool.ParseConfig(readDSN)
+		if err != nil {
+			return nil, fmt.Errorf("parse read dsn: %w", err)
+		}
+		readConfig.MaxConns = envInt32("DB_READ_MAX_CONNS", config.MaxConns)
+		readConfig.MinConns = min(envInt32("DB_READ_MIN_CONNS", 2), readConfig.MaxConns)
+		readConfig.MaxConnLifetime = config.MaxConnLifetime
+		readConfig.MaxConnIdleTime = config.MaxConnIdleTime
+		readPool, err := pgxpool.NewWithConfig(ctx, readConfig)
+		if err != nil {
+			return nil, fmt.Errorf("connect read pool: %w", err)
+		}
+		if err := readPool.Ping(ctx); err != nil {
+			readPool.Close()
+			return nil, fmt.Errorf("ping read pool: %w", err)
+		}
+		db.Read = readPool
+		logger.Info("database read pool ready", "max_conns", readConfig.MaxConns)
+	}
+
+	logger.Info("database pool ready", "max_conns", config.MaxConns, "min_conns", config.MinConns)
 	return db, nil
 }
 
+// envInt32 reads a positive integer from the environment, or returns fallback.
+func envInt32(key string, fallback int32) int32 {
+	if v, err := strconv.ParseInt(os.Getenv(key), 10, 32); err == nil && v > 0 {
+		return int32(v)
+	}
+	return fallback
+}
+
 // Migrate reads and executes the embedded SQL migration files.
 func (db *DB) Migrate(ctx context.Context) error {
 	sql, err := migrations.ReadFile("migrations/001_init.sql")
@@ -76,8 +115,11 @@ func (db *DB) Migrate(ctx context.Context) error {
 	return nil
 }
 
-// Close shuts down the connection pool.
+// Close shuts down the connection pools.
 func (db *DB) Close() {
+	if db.Read != db.Pool {
+		db.Read.Close()
+	}
 	db.Pool.Close()
 }
 
@@ -331,18 +373,54 @@ func (db *DB) UserOwnsSite(ctx context.Context, userID int, siteID int) (bool, e
 // Request log
 // ---------------------------------------------------------------------------
 
+const insertRequestLogSQL = `INSERT INTO request_log (site_id, timestamp, raw_request, classification, confidence, classifier, blocked, attack_type, response_time_ms, source_ip)
+	 VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, NULLIF($10, '')::inet)`
+
 // InsertRequestLog inserts a new request log entry.
 func (db *DB) InsertRequestLog(ctx context.Context, r *RequestLogEntry) error {
-	_, err := db.Pool.Exec(ctx,
-		`INSERT INTO request_log (site_id, raw_request, classification, confidence, classifier, blocked, attack_type, response_time_ms, source_ip)
-		 VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9::inet)`,
-		r.SiteID, r.RawRequest, r.Classification, r.Confidence, r.Classifier, r.Blocked, r.AttackType, r.ResponseTimeMs, r.SourceIP)
+	ts := r.Timestamp
+	if ts.IsZero() {
+		ts = time.Now()
+	}
+	r.sanitize()
+	_, err := db.Pool.Exec(ctx, insertRequestLogSQL,
+		r.SiteID, ts, r.RawRequest, r.Classification, r.Confidence, r.Classifier, r.Blocked, r.AttackType, r.ResponseTimeMs, r.SourceIP)
 	return err
 }
 
+// WriteRequestBatch inserts request log entries, and the threat IPs flagged
+// by blocked requests, in one transaction. The commit is asynchronous
+// (synchronous_commit=off for this transaction only): it does not wait for
+// the WAL flush, so a crash can lose the last few hundred milliseconds of
+// request log, but never corrupts it. That trade is acceptable for telemetry
+// and keeps the proxy's log writer from being bound by disk flush latency.
+func (db *DB) WriteRequestBatch(ctx context.Context, entries []RequestLogEntry, threatIPs []ThreatIPEntry) error {
+	if len(entries) == 0 && len(threatIPs) == 0 {
+		return nil
+	}
+	tx, err := db.Pool.Begin(ctx)
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback(ctx) //nolint:errcheck
+	b := &pgx.Batch{}
+	b.Queue(`SET LOCAL synchronous_commit = off`)
+	for _, r := range entries {
+		b.Queue(insertRequestLogSQL,
+			r.SiteID, r.Timestamp, r.RawRequest, r.Classification, r.Confidence, r.Classifier, r.Blocked, r.AttackType, r.ResponseTimeMs, r.SourceIP)
+	}
+	for _, t := range threatIPs {
+		b.Queue(insertThreatIPSQL, t.IP, t.Tier, t.Source)
+	}
+	if err := tx.SendBatch(ctx, b).Close(); err != nil {
+		return err
+	}
+	return tx.Commit(ctx)
+}
+
 // GetRecentRequests retrieves the most recent request log entries for a site.
 func (db *DB) GetRecentRequests(ctx context.Context, siteID int, limit int) ([]RequestLogEntry, error) {
-	rows, err := db.Pool.Query(ctx,
+	rows, err := db.Read.Query(ctx,
 		`SELECT id, site_id, timestamp, raw_request, classification, confidence, classifier, blocked, attack_type, response_time_ms, source_ip
 		 FROM request_log WHERE site_id = $1 ORDER BY timestamp DESC LIMIT $2`, siteID, limit)
 	if err != nil {
@@ -395,11 +473,11 @@ func (db *DB) GetRecentAgentLogs(ctx context.Context, siteID int, limit int) ([]
 	var rows pgx.Rows
 	var err error
 	if siteID == 0 {
-		rows, err = db.Pool.Query(ctx,
+		rows, err = db.Read.Query(ctx,
 			`SELECT id, site_id, timestamp, agent, action, detail, success
 			 FROM agent_log WHERE site_id IS NULL ORDER BY timestamp DESC LIMIT $1`, limit)
 	} else {
-		rows, err = db.Pool.Query(ctx,
+		rows, err = db.Read.Query(ctx,
 			`SELECT id, site_id, timestamp, agent, action, detail, success
 			 FROM agent_log WHERE (site_id = $1 OR site_id IS NULL) ORDER BY timestamp DESC LIMIT $2`, siteID, limit)
 	}
@@ -468,6 +546,22 @@ func (db *DB) InsertThreat(ctx context.Context, t *Threat) error {
 	return err
 }
 
+// InsertThreats inserts several threat records in a single batched round trip.
+// The batch runs as one implicit transaction, so either all rows land or none do.
+func (db *DB) InsertThreats(ctx context.Context, threats []Threat) error {
+	if len(threats) == 0 {
+		return nil
+	}
+	b := &pgx.Batch{}
+	for _, t := range threats {
+		b.Queue(
+			`INSERT INTO threats (site_id, technique_name, category, source, raw_payload, severity, blocked)
+			 VALUES ($1, $2, $3, $4, $5, $6, $7)`,
+			t.SiteID, t.TechniqueName, t.Category, t.Source, t.RawPayload, t.Severity, t.Blocked)
+	}
+	return db.Pool.SendBatch(ctx, b).Close()
+}
+
 // GetThreats retrieves all threats for a site, ordered by discovery time (newest first).
 // If siteID is 0, it queries for threats where site_id IS NULL (global/system threats).
 func (db *DB) GetThreats(ctx context.Context, siteID int) ([]Threat, error) {
@@ -512,9 +606,23 @@ func (db *DB) MarkThreatTested(ctx context.Context, threatID int64, blocked bool
 	return err
 }
 
+// MarkThreatsTested updates tested_at and blocked for several threats in one
+// statement. ids and blocked are parallel slices.
+func (db *DB) MarkThreatsTested(ctx context.Context, ids []int64, blocked []bool) error {
+	if len(ids) == 0 {
+		return nil
+	}
+	_, err := db.Pool.Exec(ctx,
+		`UPDATE threats t SET tested_at = NOW(), blocked = v.blocked
+		 FROM unnest($1::bigint[], $2::boolean[]) AS v(id, blocked)
+		 WHERE t.id = v.id`,
+		ids, blocked)
+	return err
+}
+
 // GetThreatDistribution returns threat counts grouped by category.
 func (db *DB) GetThreatDistribution(ctx context.Context) ([]ThreatCategory, error) {
-	rows, err := db.Pool.Query(ctx,
+	rows, err := db.Read.Query(ctx,
 		`SELECT category, COUNT(*) as count FROM threats GROUP BY category ORDER BY count DESC`)
 	if err != nil {
 		return nil, err
@@ -538,33 +646,38 @@ func (db *DB) GetThreatDistribution(ctx context.Context) ([]ThreatCategory, erro
 // Stats
 // ---------------------------------------------------------------------------
 
-// GetSiteStats returns aggregate stats for a site.
+// GetSiteStats returns aggregate stats for a site in a single round trip.
 func (db *DB) GetSiteStats(ctx context.Context, siteID int) (*Stats, error) {
 	var s Stats
-	err := db.Pool.QueryRow(ctx,
-		`SELECT
-		    COUNT(*),
-		    COUNT(*) FILTER (WHERE blocked),
-		    COALESCE((SELECT COUNT(*) FROM threats WHERE site_id = $1), 0),
-		    COALESCE(AVG(response_time_ms), 0)
-		 FROM request_log WHERE site_id = $1`, siteID,
-	).Scan(&s.TotalRequests, &s.BlockedCount, &s.ThreatCount, &s.AvgResponseMs)
+	err := db.Read.QueryRow(ctx,
+		`SELECT r.total, r.blocked, t.total, t.blocked, v.version, r.avg_ms
+		 FROM (SELECT COUNT(*) AS total, COUNT(*) FILTER (WHERE blocked) AS blocked,
+		              COALESCE(AVG(response_time_ms), 0) AS avg_ms
+		       FROM request_log WHERE site_id = $1) r,
+		      (SELECT COUNT(*) AS total, COUNT(*) FILTER (WHERE blocked) AS blocked
+		       FROM threats WHERE site_id = $1) t,
+		      (SELECT COALESCE(MAX(version), 1) AS version
+		       FROM rules WHERE site_id = $1 OR site_id IS NULL) v`, siteID,
+	).Scan(&s.TotalRequests, &s.BlockedCount, &s.ThreatCount, &s.ThreatsBlocked, &s.RulesVersion, &s.AvgResponseMs)
 	if err != nil {
 		return nil, err
 	}
 	return &s, nil
 }
 
-// GetComplianceReport returns a summary compliance report across all sites.
+// GetComplianceReport returns a summary compliance report across all sites,
+// scanning each table once.
 func (db *DB) GetComplianceReport(ctx context.Context) (*ComplianceReport, error) {
 	var r ComplianceReport
-	err := db.Pool.QueryRow(ctx,
-		`SELECT
-		    (SELECT COUNT(*) FROM sites),
-		    (SELECT COUNT(*) FROM sites WHERE status IN ('active','live')),
-		    (SELECT COUNT(*) FROM threats),
-		    (SELECT COUNT(*) FROM threats WHERE blocked),
-		    COALESCE((SELECT AVG(confidence) FROM request_log WHERE confidence IS NOT NULL), 0)`,
+	err := db.Read.QueryRow(ctx,
+		`SELECT s.total, s.active, t.total, t.blocked, l.avg_confidence
+		 FROM (SELECT COUNT(*) AS total,
+		              COUNT(*) FILTER (WHERE status IN ('active','live')) AS active
+		       FROM sites) s,
+		      (SELECT COUNT(*) AS total, COUNT(*) FILTER (WHERE blocked) AS blocked
+		       FROM threats) t,
+		      (SELECT COALESCE(AVG(confidence), 0) AS avg_confidence
+		       FROM request_log) l`,
 	).Scan(&r.TotalSites, &r.ActiveSites, &r.TotalThreats, &r.BlockedThreats, &r.AvgConfidence)
 	if err != nil {
 		return nil, err
@@ -633,21 +746,23 @@ func (db *DB) InsertDecision(ctx context.Context, d *Decision) error {
 	return err
 }
 
-// BulkInsertThreatIPs inserts multiple threat IP entries in a transaction.
+// BulkInsertThreatIPs inserts multiple threat IP entries in a transaction,
+// pipelined as one batch rather than a round trip per row.
 func (db *DB) BulkInsertThreatIPs(ctx context.Context, entries []ThreatIPEntry) error {
+	if len(entries) == 0 {
+		return nil
+	}
 	tx, err := db.Pool.Begin(ctx)
 	if err != nil {
 		return err
 	}
 	defer tx.Rollback(ctx) //nolint:errcheck
+	b := &pgx.Batch{}
 	for _, e := range entries {
-		_, err := tx.Exec(ctx,
-			`INSERT INTO threat_ips (ip, tier, source) VALUES ($1::inet, $2, $3)
-			 ON CONFLICT DO NOTHING`,
-			e.IP, e.Tier, e.Source)
-		if err != nil {
-			return err
-		}
+		b.Queue(insertThreatIPSQL, e.IP, e.Tier, e.Source)
+	}
+	if err := tx.SendBatch(ctx, b).Close(); err != nil {
+		return err
 	}
 	return tx.Commit(ctx)
 }
@@ -786,11 +901,12 @@ func (db *DB) SeedThreatFeeds(ctx context.Context) error {
 	return nil
 }
 
+const insertThreatIPSQL = `INSERT INTO threat_ips (ip, tier, source) VALUES ($1::inet, $2, $3)
+	 ON CONFLICT DO NOTHING`
+
 // InsertSingleThreatIP inserts a single threat IP entry (e.g. from live WAF blocking).
 func (db *DB) InsertSingleThreatIP(ctx context.Context, ip, tier, source string) error {
-	_, err := db.Pool.Exec(ctx,
-		`INSERT INTO threat_ips (ip, tier, source) VALUES ($1::inet, $2, $3)
-		 ON CONFLICT DO NOTHING`, ip, tier, source)
+	_, err := db.Pool.Exec(ctx, insertThreatIPSQL, ip, tier, source)
 	return err
 }
 
@@ -992,20 +1108,21 @@ func (db *DB) EnsureCurrentAndNextPartitions(ctx context.Context) error {
 // Global queries (cross-site, for frontend compatibility)
 // ---------------------------------------------------------------------------
 
-// GetGlobalStats returns aggregate stats across all sites.
+// GetGlobalStats returns aggregate stats across all sites in a single round trip.
 func (db *DB) GetGlobalStats(ctx context.Context) (*Stats, error) {
 	if ctx == nil {
 		ctx = context.Background()
 	}
 	var s Stats
-	err := db.Pool.QueryRow(ctx,
-		`SELECT
-		    COUNT(*),
-		    COUNT(*) FILTER (WHERE blocked),
-		    COALESCE((SELECT COUNT(*) FROM threats WHERE site_id IS NOT NULL), 0),
-		    COALESCE(AVG(response_time_ms), 0)
-		 FROM request_log`,
-	).Scan(&s.TotalRequests, &s.BlockedCount, &s.ThreatCount, &s.AvgResponseMs)
+	err := db.Read.QueryRow(ctx,
+		`SELECT r.total, r.blocked, t.total, t.blocked, v.version, r.avg_ms
+		 FROM (SELECT COUNT(*) AS total, COUNT(*) FILTER (WHERE blocked) AS blocked,
+		              COALESCE(AVG(response_time_ms), 0) AS avg_ms
+		       FROM request_log) r,
+		      (SELECT COUNT(*) AS total, COUNT(*) FILTER (WHERE blocked) AS blocked
+		       FROM threats WHERE site_id IS NOT NULL) t,
+		      (SELECT COALESCE(MAX(version), 1) AS version FROM rules) v`,
+	).Scan(&s.TotalRequests, &s.BlockedCount, &s.ThreatCount, &s.ThreatsBlocked, &s.RulesVersion, &s.AvgResponseMs)
 	if err != nil {
 		return nil, err
 	}
@@ -1013,13 +1130,15 @@ func (db *DB) GetGlobalStats(ctx context.Context) (*Stats, error) {
 }
 
 // GetGlobalRecentRequests retrieves the most recent request log entries across all sites.
-func (db *DB) GetGlobalRecentRequests(ctx context.Context, limit int) ([]RequestLogEntry, error) {
+// RawRequest is truncated to rawLen characters in SQL, since callers only
+// display a preview and full payloads can be large.
+func (db *DB) GetGlobalRecentRequests(ctx context.Context, limit, rawLen int) ([]RequestLogEntry, error) {
 	if ctx == nil {
 		ctx = context.Background()
 	}
-	rows, err := db.Pool.Query(ctx,
-		`SELECT id, site_id, timestamp, raw_request, classification, confidence, classifier, blocked, attack_type, response_time_ms, source_ip
-		 FROM request_log ORDER BY timestamp DESC LIMIT $1`, limit)
+	rows, err := db.Read.Query(ctx,
+		`SELECT id, site_id, timestamp, left(raw_request, $2), classification, confidence, classifier, blocked, attack_type, response_time_ms, source_ip
+		 FROM request_log ORDER BY timestamp DESC LIMIT $1`, limit, rawLen)
 	if err != nil {
 		return nil, err
 	}
@@ -1058,7 +1177,7 @@ func (db *DB) GetGlobalRecentAgentLogs(ctx context.Context, limit int) ([]AgentL
 	if ctx == nil {
 		ctx = context.Background()
 	}
-	rows, err := db.Pool.Query(ctx,
+	rows, err := db.Read.Query(ctx,
 		`SELECT id, site_id, timestamp, agent, action, detail, success
 		 FROM agent_log WHERE site_id IS NOT NULL ORDER BY timestamp DESC LIMIT $1`, limit)
 	if err != nil {
@@ -1083,14 +1202,16 @@ func (db *DB) GetGlobalRecentAgentLogs(ctx context.Context, limit int) ([]AgentL
 	return entries, nil
 }
 
-// GetGlobalThreats retrieves threats across all real sites (excludes agent-generated synthetic data).
-func (db *DB) GetGlobalThreats(ctx context.Context) ([]Threat, error) {
+// GetGlobalThreats retrieves a page of threats across all real sites (excludes
+// agent-generated synthetic data), newest first. RawPayload is truncated to
+// payloadLen characters in SQL. A limit of 0 returns every row from offset on.
+func (db *DB) GetGlobalThreats(ctx context.Context, limit, offset, payloadLen int) ([]Threat, error) {
 	if ctx == nil {
 		ctx = context.Background()
 	}
-	rows, err := db.Pool.Query(ctx,
-		`SELECT id, site_id, technique_name, category, source, raw_payload, severity, discovered_at, tested_at, blocked, patched_at
-		 FROM threats WHERE site_id IS NOT NULL ORDER BY discovered_at DESC`)
+	rows, err := db.Read.Query(ctx,
+		`SELECT id, site_id, technique_name, category, source, left(raw_payload, $3), severity, discovered_at, tested_at, blocked, patched_at
+		 FROM threats WHERE site_id IS NOT NULL ORDER BY discovered_at DESC LIMIT NULLIF($1, 0) OFFSET $2`, limit, offset, payloadLen)
 	if err != nil {
 		return nil, err
 	}
@@ -1255,14 +1376,15 @@ func (db *DB) GetRegexBypasses(ctx context.Context, window time.Duration, limit
 	return entries, rows.Err()
 }
 
-// GetAllRuleVersions retrieves all rule versions, newest first.
-func (db *DB) GetAllRuleVersions(ctx context.Context) ([]Rules, error) {
+// GetAllRuleVersions retrieves a page of rule versions, newest first. A limit
+// of 0 returns every row from offset on.
+func (db *DB) GetAllRuleVersions(ctx context.Context, limit, offset int) ([]Rules, error) {
 	if ctx == nil {
 		ctx = context.Background()
 	}
-	rows, err := db.Pool.Query(ctx,
+	rows, err := db.Read.Query(ctx,
 		`SELECT id, site_id, version, crusoe_prompt, claude_prompt, updated_at, updated_by
-		 FROM rules ORDER BY version DESC`)
+		 FROM rules ORDER BY version DESC LIMIT NULLIF($1, 0) OFFSET $2`, limit, offset)
 	if err != nil {
 		return nil, err
 	}
@@ -0,0 +1,181 @@
+package db
+
+import (
+	"context"
+	"log/slog"
+	"net"
+	"strings"
+	"sync"
+	"time"
+	"unicode/utf8"
+)
+
+const (
+	logWriterQueueSize     = 4096
+	logWriterBatchSize     = 100
+	logWriterFlushInterval = 100 * time.Millisecond
+)
+
+// RequestLogWriter buffers request log rows, and the threat IPs flagged by
+// blocked requests, in memory and writes them in batches, so the proxy hot
+// path costs a channel send instead of a database round trip and a commit
+// per request.
+type RequestLogWriter struct {
+	db        *DB
+	logger    *slog.Logger
+	queue     chan RequestLogEntry
+	threatIPs chan ThreatIPEntry
+
+	// stopped is set once Run has begun its final drain; later rows are
+	// refused so callers insert them directly instead of stranding them in
+	// the queue.
+	mu      sync.RWMutex
+	stopped bool
+}
+
+// NewRequestLogWriter creates a write-behind queue for request_log.
+func NewRequestLogWriter(database *DB, logger *slog.Logger) *RequestLogWriter {
+	return &RequestLogWriter{
+		db:        database,
+		logger:    logger,
+		queue:     make(chan RequestLogEntry, logWriterQueueSize),
+		threatIPs: make(chan ThreatIPEntry, logWriterQueueSize),
+	}
+}
+
+// Enqueue queues a row for the next batch. It never blocks; if the queue is
+// full or the writer has stopped it reports false and the caller should
+// insert the row directly.
+func (w *RequestLogWriter) Enqueue(r *RequestLogEntry) bool {
+	if r.Timestamp.IsZero() {
+		r.Timestamp = time.Now()
+	}
+	r.sanitize()
+	w.mu.RLock()
+	defer w.mu.RUnlock()
+	if w.stopped {
+		return false
+	}
+	select {
+	case w.queue <- *r:
+		return true
+	default:
+		return false
+	}
+}
+
+// EnqueueThreatIP queues a threat_ips row for the next batch. Like Enqueue it
+// never blocks and reports false if the queue is full or the writer has
+// stopped. A value that isn't an IP is dropped (reporting true), since its
+// inet cast would fail the batch.
+func (w *RequestLogWriter) EnqueueThreatIP(ip, tier, source string) bool {
+	if net.ParseIP(ip) == nil {
+		return true
+	}
+	w.mu.RLock()
+	defer w.mu.RUnlock()
+	if w.stopped {
+		return false
+	}
+	select {
+	case w.threatIPs <- ThreatIPEntry{IP: ip, Tier: tier, Source: source}:
+		return true
+	default:
+		return false
+	}
+}
+
+// sanitize makes r insertable whatever the client sent. A batch is one
+// transaction, so a single row Postgres rejects would lose all of them:
+// raw_request must be valid UTF-8 without NUL bytes (it may have been cut
+// mid-character when truncated), and source_ip, taken from the
+// client-supplied X-Real-IP, is stored as NULL unless it parses as an IP.
+func (r *RequestLogEntry) sanitize() {
+	if !utf8.ValidString(r.RawRequest) {
+		r.RawRequest = strings.ToValidUTF8(r.RawRequest, "\uFFFD")
+	}
+	if strings.IndexByte(r.RawRequest, 0) >= 0 {
+		r.RawRequest = strings.ReplaceAll(r.RawRequest, "\x00", "\uFFFD")
+	}
+	if net.ParseIP(r.SourceIP) == nil {
+		r.SourceIP = ""
+	}
+}
+
+// requestBatch is the set of rows written by one flush.
+type requestBatch struct {
+	logs      []RequestLogEntry
+	threatIPs []ThreatIPEntry
+}
+
+func (b *requestBatch) full() bool {
+	return len(b.logs)+len(b.threatIPs) >= logWriterBatchSize
+}
+
+func (b *requestBatch) empty() bool {
+	return len(b.logs) == 0 && len(b.threatIPs) == 0
+}
+
+// Run drains the queues, flushing every logWriterBatchSize rows or
+// logWriterFlushInterval, whichever comes first. When ctx is cancelled it
+// stops accepting rows and flushes everything still queued before returning.
+func (w *RequestLogWriter) Run(ctx context.Context) {
+	ticker := time.NewTicker(logWriterFlushInterval)
+	defer ticker.Stop()
+
+	batch := &requestBatch{
+		logs:      make([]RequestLogEntry, 0, logWriterBatchSize),
+		threatIPs: make([]ThreatIPEntry, 0, logWriterBatchSize),
+	}
+	for {
+		select {
+		case <-ctx.Done():
+			// Once stopped is set under the write lock no Enqueue can still
+			// be mid-send, so the drain below sees every accepted row.
+			w.mu.Lock()
+			w.stopped = true
+			w.mu.Unlock()
+			for {
+				select {
+				case r := <-w.queue:
+					batch.logs = append(batch.logs, r)
+				case t := <-w.threatIPs:
+					batch.threatIPs = append(batch.threatIPs, t)
+				default:
+					w.flush(batch)
+					return
+				}
+				if batch.full() {
+					w.flush(batch)
+				}
+			}
+		case r := <-w.queue:
+			batch.logs = append(batch.logs, r)
+			if batch.full() {
+				w.flush(batch)
+			}
+		case t := <-w.threatIPs:
+			batch.threatIPs = append(batch.threatIPs, t)
+			if batch.full() {
+				w.flush(batch)
+			}
+		case <-ticker.C:
+			w.flush(batch)
+		}
+	}
+}
+
+// flush writes batch and empties it for reuse.
+func (w *RequestLogWriter) flush(batch *requestBatch) {
+	if batch.empty() {
+		return
+	}
+	ctx, cancel := context.WithTimeout(context.Background(), 5*time.Second)
+	defer cancel()
+	if err := w.db.WriteRequestBatch(ctx, batch.logs, batch.threatIPs); err != nil {
+		w.logger.Error("failed to write request log batch",
+			"rows", len(batch.logs), "threat_ips", len(batch.threatIPs), "err", err)
+	}
+	batch.logs = batch.logs[:0]
+	batch.threatIPs = batch.threatIPs[:0]
+}
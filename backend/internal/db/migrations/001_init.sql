@@ -54,6 +54,10 @@ CREATE TABLE IF NOT EXISTS threats (
     blocked         BOOLEAN NOT NULL DEFAULT FALSE,
     patched_at      TIMESTAMPTZ
 );
+CREATE INDEX IF NOT EXISTS idx_threats_discovered ON threats(discovered_at DESC);
+CREATE INDEX IF NOT EXISTS idx_threats_blocked ON threats(site_id) WHERE blocked;
+-- Threat distribution (GROUP BY category) can be answered from the index alone.
+CREATE INDEX IF NOT EXISTS idx_threats_category ON threats(category);
 
 CREATE TABLE IF NOT EXISTS request_log (
     id              BIGINT GENERATED ALWAYS AS IDENTITY,
@@ -69,7 +73,17 @@ CREATE TABLE IF NOT EXISTS request_log (
     source_ip       inet,
     PRIMARY KEY (id, timestamp)
 ) PARTITION BY RANGE (timestamp);
-CREATE INDEX IF NOT EXISTS idx_request_log_site ON request_log(site_id);
+-- site_id lookups use the leading column of idx_request_log_site_timestamp;
+-- drop the old single-column index on databases that still have it.
+DROP INDEX IF EXISTS idx_request_log_site;
+-- Newest-first feeds (/api/requests, dashboard hydration) read the top N rows.
+CREATE INDEX IF NOT EXISTS idx_request_log_timestamp ON request_log(timestamp DESC);
+-- Per-site feeds (dashboard + SSE hydration): newest N rows for one site.
+CREATE INDEX IF NOT EXISTS idx_request_log_site_timestamp ON request_log(site_id, timestamp DESC);
+-- Partial indexes for the blocked-request analytics (repeat offenders, regex
+-- bypasses, recent attack types) — blocked rows are a small slice of the log.
+CREATE INDEX IF NOT EXISTS idx_request_log_blocked ON request_log(timestamp DESC) WHERE blocked;
+CREATE INDEX IF NOT EXISTS idx_request_log_site_blocked ON request_log(site_id, timestamp DESC) WHERE blocked;
 
 CREATE TABLE IF NOT EXISTS agent_log (
     id          BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
@@ -80,6 +94,8 @@ CREATE TABLE IF NOT EXISTS agent_log (
     detail      TEXT,
     success     BOOLEAN NOT NULL DEFAULT TRUE
 );
+CREATE INDEX IF NOT EXISTS idx_agent_log_timestamp ON agent_log(timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_agent_log_site_timestamp ON agent_log(site_id, timestamp DESC);
 
 CREATE TABLE IF NOT EXISTS rules (
     id          BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
@@ -90,6 +106,7 @@ CREATE TABLE IF NOT EXISTS rules (
     updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_by  TEXT NOT NULL DEFAULT 'system'
 );
+CREATE INDEX IF NOT EXISTS idx_rules_version ON rules(version DESC);
 
 -- Behavioral tables
 CREATE TABLE IF NOT EXISTS decisions (
@@ -203,10 +203,12 @@ type CodeFinding struct {
 
 // Stats aggregation types
 type Stats struct {
-	TotalRequests int64   `json:"total_requests"`
-	BlockedCount  int64   `json:"blocked_count"`
-	ThreatCount   int64   `json:"threat_count"`
-	AvgResponseMs float64 `json:"avg_response_ms"`
+	TotalRequests  int64   `json:"total_requests"`
+	BlockedCount   int64   `json:"blocked_count"`
+	ThreatCount    int64   `json:"threat_count"`
+	ThreatsBlocked int64   `json:"threats_blocked"`
+	RulesVersion   int     `json:"rules_version"`
+	AvgResponseMs  float64 `json:"avg_response_ms"`
 }
 
 type ThreatCategory struct {
@@ -63,26 +63,37 @@ func (ch *CompatHandler) GetGlobalStats(w http.ResponseWriter, r *http.Request)
 	}
 
 	// Match Python backend response format
-	threatsBlocked := stats.ThreatCount // approximate
 	blockRate := 0.0
 	if stats.ThreatCount > 0 {
-		blockRate = float64(threatsBlocked) / float64(stats.ThreatCount) * 100
+		blockRate = float64(stats.ThreatsBlocked) / float64(stats.ThreatCount) * 100
 	}
 
 	w.Header().Set("Content-Type", "application/json")
-	json.NewEncoder(w).Encode(map[string]any{
-		"total_requests":  stats.TotalRequests,
-		"blocked_requests": stats.BlockedCount,
-		"total_threats":   stats.ThreatCount,
-		"threats_blocked": threatsBlocked,
-		"block_rate":      blockRate,
-		"rules_version":   1,
+	json.NewEncoder(w).Encode(globalStatsResp{
+		TotalRequests:   stats.TotalRequests,
+		BlockedRequests: stats.BlockedCount,
+		TotalThreats:    stats.ThreatCount,
+		ThreatsBlocked:  stats.ThreatsBlocked,
+		BlockRate:       blockRate,
+		RulesVersion:    stats.RulesVersion,
 	})
 }
 
-// GetGlobalThreats handles GET /api/threats — all threats across all sites.
+// globalStatsResp is the /api/stats payload. Field order matches the Python
+// backend's response.
+type globalStatsResp struct {
+	TotalRequests   int64   `json:"total_requests"`
+	BlockedRequests int64   `json:"blocked_requests"`
+	TotalThreats    int64   `json:"total_threats"`
+	ThreatsBlocked  int64   `json:"threats_blocked"`
+	BlockRate       float64 `json:"block_rate"`
+	RulesVersion    int     `json:"rules_version"`
+}
+
+// GetGlobalThreats handles GET /api/threats?limit=&offset= — threats across all sites.
 func (ch *CompatHandler) GetGlobalThreats(w http.ResponseWriter, r *http.Request) {
-	threats, err := ch.db.GetGlobalThreats(r.Context())
+	limit, offset := pageParams(r)
+	threats, err := ch.db.GetGlobalThreats(r.Context(), limit, offset, 200)
 	if err != nil {
 		jsonError(w, "failed to fetch threats", http.StatusInternalServerError)
 		return
@@ -104,16 +115,12 @@ func (ch *CompatHandler) GetGlobalThreats(w http.ResponseWriter, r *http.Request
 
 	result := make([]threatResp, 0, len(threats))
 	for _, t := range threats {
-		payload := t.RawPayload
-		if len(payload) > 200 {
-			payload = payload[:200]
-		}
 		tr := threatResp{
 			ID:            t.ID,
 			TechniqueName: t.TechniqueName,
 			Category:      t.Category,
 			Source:        t.Source,
-			RawPayload:    payload,
+			RawPayload:    t.RawPayload,
 			Severity:      t.Severity,
 			DiscoveredAt:  t.DiscoveredAt.Format(time.RFC3339),
 			Blocked:       t.Blocked,
@@ -168,7 +175,7 @@ func (ch *CompatHandler) GetGlobalAgentLogs(w http.ResponseWriter, r *http.Reque
 
 // GetGlobalRequests handles GET /api/requests — recent request logs.
 func (ch *CompatHandler) GetGlobalRequests(w http.ResponseWriter, r *http.Request) {
-	requests, err := ch.db.GetGlobalRecentRequests(r.Context(), 100)
+	requests, err := ch.db.GetGlobalRecentRequests(r.Context(), 100, 100)
 	if err != nil {
 		jsonError(w, "failed to fetch requests", http.StatusInternalServerError)
 		return
@@ -188,14 +195,10 @@ func (ch *CompatHandler) GetGlobalRequests(w http.ResponseWriter, r *http.Reques
 
 	result := make([]reqResp, 0, len(requests))
 	for _, r := range requests {
-		msg := r.RawRequest
-		if len(msg) > 100 {
-			msg = msg[:100]
-		}
 		result = append(result, reqResp{
 			ID:             r.ID,
 			Timestamp:      r.Timestamp.Format(time.RFC3339),
-			Message:        msg,
+			Message:        r.RawRequest,
 			Classification: r.Classification,
 			Confidence:     r.Confidence,
 			Classifier:     r.Classifier,
@@ -209,9 +212,10 @@ func (ch *CompatHandler) GetGlobalRequests(w http.ResponseWriter, r *http.Reques
 	json.NewEncoder(w).Encode(result)
 }
 
-// GetGlobalRules handles GET /api/rules — all rule versions.
+// GetGlobalRules handles GET /api/rules?limit=&offset= — rule versions, newest first.
 func (ch *CompatHandler) GetGlobalRules(w http.ResponseWriter, r *http.Request) {
-	rules, err := ch.db.GetAllRuleVersions(r.Context())
+	limit, offset := pageParams(r)
+	rules, err := ch.db.GetAllRuleVersions(r.Context(), limit, offset)
 	if err != nil {
 		w.Header().Set("Content-Type", "application/json")
 		json.NewEncoder(w).Encode([]any{})
@@ -262,7 +266,11 @@ func (ch *CompatHandler) TriggerPeek(w http.ResponseWriter, r *http.Request) {
 	if ch.limiter.Check(w, r, "agents") {
 		return
 	}
-	result := ch.agents.RunOnce(r.Context())
+	result, err := ch.agents.RunOnce(r.Context())
+	if err != nil {
+		jsonError(w, "agent cycle did not start", http.StatusServiceUnavailable)
+		return
+	}
 	w.Header().Set("Content-Type", "application/json")
 	json.NewEncoder(w).Encode(map[string]any{
 		"discovered":      result.Discovered,
@@ -275,7 +283,11 @@ func (ch *CompatHandler) TriggerPoke(w http.ResponseWriter, r *http.Request) {
 	if ch.limiter.Check(w, r, "agents") {
 		return
 	}
-	result := ch.agents.RunOnce(r.Context())
+	result, err := ch.agents.RunOnce(r.Context())
+	if err != nil {
+		jsonError(w, "agent cycle did not start", http.StatusServiceUnavailable)
+		return
+	}
 	w.Header().Set("Content-Type", "application/json")
 	json.NewEncoder(w).Encode(map[string]any{
 		"bypasses": result.Bypasses,
@@ -287,9 +299,17 @@ func (ch *CompatHandler) TriggerCycle(w http.ResponseWriter, r *http.Request) {
 	if ch.limiter.Check(w, r, "agents") {
 		return
 	}
-	result := ch.agents.RunOnce(r.Context())
+	result, err := ch.agents.RunOnce(r.Context())
+	if err != nil {
+		jsonError(w, "agent cycle did not start", http.StatusServiceUnavailable)
+		return
+	}
 
-	stats, _ := ch.db.GetGlobalStats(r.Context())
+	// The cycle already fetched stats to broadcast them; reuse those.
+	stats := result.Stats
+	if stats == nil {
+		stats, _ = ch.db.GetGlobalStats(r.Context())
+	}
 
 	w.Header().Set("Content-Type", "application/json")
 	json.NewEncoder(w).Encode(map[string]any{
@@ -302,6 +322,23 @@ func (ch *CompatHandler) TriggerCycle(w http.ResponseWriter, r *http.Request) {
 	})
 }
 
+// maxPageSize caps the ?limit= accepted by paginated list endpoints.
+const maxPageSize = 500
+
+// pageParams parses ?limit= and ?offset= query params, clamping limit to
+// maxPageSize. Without ?limit= it returns 0, meaning no limit: the dashboard
+// fetches these lists whole and derives totals from them, so paging is opt-in.
+func pageParams(r *http.Request) (limit, offset int) {
+	q := r.URL.Query()
+	if v, err := strconv.Atoi(q.Get("limit")); err == nil && v > 0 {
+		limit = min(v, maxPageSize)
+	}
+	if v, err := strconv.Atoi(q.Get("offset")); err == nil && v > 0 {
+		offset = v
+	}
+	return limit, offset
+}
+
 // validAgents is the allowlist of agent IDs that can be queried.
 var validAgents = map[string]bool{"peek": true, "poke": true, "patch": true, "system": true}
 
@@ -13,11 +13,12 @@ import (
 
 type DashboardHandler struct {
 	db     *db.DB
+	owners *OwnerCache
 	logger *slog.Logger
 }
 
-func NewDashboardHandler(database *db.DB, logger *slog.Logger) *DashboardHandler {
-	return &DashboardHandler{db: database, logger: logger}
+func NewDashboardHandler(database *db.DB, owners *OwnerCache, logger *slog.Logger) *DashboardHandler {
+	return &DashboardHandler{db: database, owners: owners, logger: logger}
 }
 
 // Helper: extract siteID and verify ownership
@@ -28,7 +29,7 @@ func (dh *DashboardHandler) getSiteID(w http.ResponseWriter, r *http.Request) (i
 		jsonError(w, "invalid site ID", http.StatusBadRequest)
 		return 0, false
 	}
-	owns, err := dh.db.UserOwnsSite(r.Context(), user.ID, siteID)
+	owns, err := dh.owners.owns(r.Context(), dh.db, user.ID, siteID)
 	if err != nil || !owns {
 		jsonError(w, "forbidden", http.StatusForbidden)
 		return 0, false
@@ -0,0 +1,72 @@
+package handlers
+
+import (
+	"context"
+	"sync"
+	"time"
+
+	"github.com/veil-waf/veil-go/internal/db"
+)
+
+// ownerCacheTTL bounds how long a confirmed user→site ownership is trusted
+// without going back to the database.
+const ownerCacheTTL = 30 * time.Second
+
+type ownerKey struct {
+	userID int
+	siteID int
+}
+
+// OwnerCache memoizes positive UserOwnsSite checks. A dashboard page load
+// fans out into several site-scoped API calls plus an SSE stream, each of
+// which would otherwise repeat the same ownership query. Negative results are
+// not cached, and deleting a site drops its entries. One cache is shared by
+// every handler that checks site ownership.
+type OwnerCache struct {
+	mu      sync.RWMutex
+	entries map[ownerKey]time.Time // expiry
+}
+
+// NewOwnerCache creates an empty OwnerCache.
+func NewOwnerCache() *OwnerCache {
+	return &OwnerCache{entries: make(map[ownerKey]time.Time)}
+}
+
+// owns reports whether userID owns siteID, consulting the cache first.
+func (c *OwnerCache) owns(ctx context.Context, database *db.DB, userID, siteID int) (bool, error) {
+	k := ownerKey{userID: userID, siteID: siteID}
+	now := time.Now()
+
+	c.mu.RLock()
+	expires, ok := c.entries[k]
+	c.mu.RUnlock()
+	if ok && now.Before(expires) {
+		return true, nil
+	}
+
+	owns, err := database.UserOwnsSite(ctx, userID, siteID)
+	if err != nil || !owns {
+		return owns, err
+	}
+
+	c.mu.Lock()
+	for key, exp := range c.entries {
+		if now.After(exp) {
+			delete(c.entries, key)
+		}
+	}
+	c.entries[k] = now.Add(ownerCacheTTL)
+	c.mu.Unlock()
+	return true, nil
+}
+
+// forgetSite drops all cached ownership entries for siteID.
+func (c *OwnerCache) forgetSite(siteID int) {
+	c.mu.Lock()
+	for key := range c.entries {
+		if key.siteID == siteID {
+			delete(c.entries, key)
+		}
+	}
+	c.mu.Unlock()
+}
@@ -18,12 +18,13 @@ import (
 type RepoHandler struct {
 	db      *db.DB
 	scanner *repo.Scanner
+	owners  *OwnerCache
 	logger  *slog.Logger
 }
 
 // NewRepoHandler creates a new RepoHandler.
-func NewRepoHandler(database *db.DB, scanner *repo.Scanner, logger *slog.Logger) *RepoHandler {
-	return &RepoHandler{db: database, scanner: scanner, logger: logger}
+func NewRepoHandler(database *db.DB, scanner *repo.Scanner, owners *OwnerCache, logger *slog.Logger) *RepoHandler {
+	return &RepoHandler{db: database, scanner: scanner, owners: owners, logger: logger}
 }
 
 // getSiteID extracts and validates site ownership from the request.
@@ -34,7 +35,7 @@ func (rh *RepoHandler) getSiteID(w http.ResponseWriter, r *http.Request) (int, b
 		jsonError(w, "invalid site ID", http.StatusBadRequest)
 		return 0, false
 	}
-	owns, err := rh.db.UserOwnsSite(r.Context(), user.ID, siteID)
+	owns, err := rh.owners.owns(r.Context(), rh.db, user.ID, siteID)
 	if err != nil || !owns {
 		jsonError(w, "forbidden", http.StatusForbidden)
 		return 0, false
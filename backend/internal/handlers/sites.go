@@ -20,11 +20,12 @@ import (
 type SiteHandler struct {
 	db       *db.DB
 	verifier *veildns.Verifier
+	owners   *OwnerCache
 	logger   *slog.Logger
 }
 
-func NewSiteHandler(database *db.DB, verifier *veildns.Verifier, logger *slog.Logger) *SiteHandler {
-	return &SiteHandler{db: database, verifier: verifier, logger: logger}
+func NewSiteHandler(database *db.DB, verifier *veildns.Verifier, owners *OwnerCache, logger *slog.Logger) *SiteHandler {
+	return &SiteHandler{db: database, verifier: verifier, owners: owners, logger: logger}
 }
 
 // createSiteRequest accepts both Python-style {url} and Go-style {domain, name}.
@@ -282,7 +283,7 @@ func (sh *SiteHandler) VerifySiteNow(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	owns, err := sh.db.UserOwnsSite(r.Context(), user.ID, siteID)
+	owns, err := sh.owners.owns(r.Context(), sh.db, user.ID, siteID)
 	if err != nil || !owns {
 		jsonError(w, "forbidden", http.StatusForbidden)
 		return
@@ -319,6 +320,7 @@ func (sh *SiteHandler) DeleteSite(w http.ResponseWriter, r *http.Request) {
 		jsonError(w, "site not found or not owned by you", http.StatusNotFound)
 		return
 	}
+	sh.owners.forgetSite(siteID)
 
 	// Return Python-compatible response
 	w.Header().Set("Content-Type", "application/json")
@@ -14,13 +14,14 @@ import (
 
 // StreamHandler serves SSE streams for real-time site event monitoring.
 type StreamHandler struct {
-	hub *sse.Hub
-	db  *db.DB
+	hub    *sse.Hub
+	db     *db.DB
+	owners *OwnerCache
 }
 
 // NewStreamHandler creates a new StreamHandler.
-func NewStreamHandler(hub *sse.Hub, database *db.DB) *StreamHandler {
-	return &StreamHandler{hub: hub, db: database}
+func NewStreamHandler(hub *sse.Hub, database *db.DB, owners *OwnerCache) *StreamHandler {
+	return &StreamHandler{hub: hub, db: database, owners: owners}
 }
 
 // HandleSSE handles GET /api/stream/events?site_id=X
@@ -46,7 +47,7 @@ func (sh *StreamHandler) HandleSSE(w http.ResponseWriter, r *http.Request) {
 	}
 
 	user := auth.GetUserFromCtx(r.Context())
-	owns, err := sh.db.UserOwnsSite(r.Context(), user.ID, siteID)
+	owns, err := sh.owners.owns(r.Context(), sh.db, user.ID, siteID)
 	if err != nil || !owns {
 		jsonError(w, "forbidden", http.StatusForbidden)
 		return
@@ -100,6 +101,12 @@ func (sh *StreamHandler) HandleSSE(w http.ResponseWriter, r *http.Request) {
 				return
 			}
 			fmt.Fprintf(w, "event: %s\ndata: %s\n\n", event.Type, event.Data)
+			// Coalesce: write whatever else is already queued (a request event
+			// is always followed by its stats_increment) and flush once, so a
+			// burst goes out in one TCP/TLS write instead of one per event.
+			if !drainEvents(w, ch) {
+				return
+			}
 			flusher.Flush()
 		case <-keepalive.C:
 			fmt.Fprintf(w, ": keepalive\n\n")
@@ -107,3 +114,19 @@ func (sh *StreamHandler) HandleSSE(w http.ResponseWriter, r *http.Request) {
 		}
 	}
 }
+
+// drainEvents writes all events currently buffered in ch without blocking.
+// It reports false if ch was closed.
+func drainEvents(w http.ResponseWriter, ch chan sse.Event) bool {
+	for {
+		select {
+		case event, ok := <-ch:
+			if !ok {
+				return false
+			}
+			fmt.Fprintf(w, "event: %s\ndata: %s\n\n", event.Type, event.Data)
+		default:
+			return true
+		}
+	}
+}
@@ -1,6 +1,7 @@
 package proxy
 
 import (
+	"bytes"
 	"context"
 	"crypto/tls"
 	"encoding/json"
@@ -13,6 +14,7 @@ import (
 	stdpath "path"
 	"strconv"
 	"strings"
+	"sync"
 	"time"
 
 	"github.com/veil-waf/veil-go/internal/classify"
@@ -61,13 +63,51 @@ func ssrfSafeDial(ctx context.Context, network, addr string) (net.Conn, error) {
 	return ssrfSafeDialer.DialContext(ctx, network, safeAddr)
 }
 
+const (
+	// maxBodyBytes caps the request body forwarded upstream.
+	maxBodyBytes = 10 << 20 // 10 MB
+	// classifyBodyBytes is how much of the body the classifiers see. The rest
+	// is streamed to the upstream without being buffered.
+	classifyBodyBytes = 4096
+)
+
+// Header sets keyed by canonical name (net/http canonicalizes incoming keys).
+var (
+	// classifyExcludedHeaders are left out of the raw request given to the
+	// classifiers: framing headers that say nothing about intent.
+	classifyExcludedHeaders = map[string]bool{
+		"Host": true, "Connection": true, "Transfer-Encoding": true,
+		"Content-Length": true,
+	}
+	// forwardStrippedHeaders are hop-by-hop and spoofable forwarded headers
+	// that are never passed upstream.
+	forwardStrippedHeaders = map[string]bool{
+		"Host": true, "Connection": true, "Transfer-Encoding": true,
+		"Content-Length": true, "X-Forwarded-Host": true, "X-Forwarded-Proto": true,
+		"X-Forwarded-For": true, "X-Real-Ip": true, "Via": true,
+	}
+	// responseExcludedHeaders are dropped when copying the upstream response.
+	responseExcludedHeaders = map[string]bool{
+		"Transfer-Encoding": true,
+		"Connection":        true,
+		"Content-Encoding":  true,
+		"Content-Length":    true,
+	}
+)
+
+// proxyClient has no overall Timeout: that would also cover reading the
+// body and cut off streamed responses (SSE, long polls). Upstreams are bounded
+// by ResponseHeaderTimeout instead, and the body by the client's request
+// context, which is cancelled when the client goes away.
 var proxyClient = &http.Client{
-	Timeout: 30 * time.Second,
 	Transport: &http.Transport{
-		DialContext:         ssrfSafeDial,
-		MaxIdleConnsPerHost: 20,
-		IdleConnTimeout:     90 * time.Second,
-		TLSClientConfig:    &tls.Config{InsecureSkipVerify: true}, // Accept self-signed certs on origins (like Cloudflare "Full" mode)
+		DialContext:           ssrfSafeDial,
+		TLSHandshakeTimeout:   10 * time.Second,
+		ResponseHeaderTimeout: 30 * time.Second,
+		MaxIdleConns:          200,
+		MaxIdleConnsPerHost:   50,
+		IdleConnTimeout:       90 * time.Second,
+		TLSClientConfig:       &tls.Config{InsecureSkipVerify: true}, // Accept self-signed certs on origins (like Cloudflare "Full" mode)
 	},
 	CheckRedirect: func(req *http.Request, via []*http.Request) error {
 		if len(via) >= 10 {
@@ -84,16 +124,20 @@ type Handler struct {
 	hub      *sse.Hub
 	limiter  *ratelimit.Limiter
 	logger   *slog.Logger
+	logs     *db.RequestLogWriter
+	sites    *siteCache
 }
 
 // NewHandler creates a new proxy handler.
-func NewHandler(database *db.DB, pipeline *classify.Pipeline, hub *sse.Hub, limiter *ratelimit.Limiter, logger *slog.Logger) *Handler {
+func NewHandler(database *db.DB, pipeline *classify.Pipeline, hub *sse.Hub, limiter *ratelimit.Limiter, logs *db.RequestLogWriter, logger *slog.Logger) *Handler {
 	return &Handler{
 		db:       database,
 		pipeline: pipeline,
 		hub:      hub,
 		limiter:  limiter,
 		logger:   logger,
+		logs:     logs,
+		sites:    newSiteCache(),
 	}
 }
 
@@ -109,10 +153,15 @@ func (h *Handler) HostRoute(w http.ResponseWriter, r *http.Request) {
 		host = hp
 	}
 
-	site, err := h.db.GetSiteByDomain(r.Context(), host)
-	if err != nil {
-		http.Error(w, `{"error":"Unknown domain"}`, http.StatusNotFound)
-		return
+	site := h.sites.get(host)
+	if site == nil {
+		var err error
+		site, err = h.db.GetSiteByDomain(r.Context(), host)
+		if err != nil {
+			http.Error(w, `{"error":"Unknown domain"}`, http.StatusNotFound)
+			return
+		}
+		h.sites.put(host, site)
 	}
 
 	h.proxyRequest(w, r, site, r.URL.Path)
@@ -200,35 +249,50 @@ func (h *Handler) proxyRequest(w http.ResponseWriter, r *http.Request, site *db.
 		return
 	}
 
-	// Build raw request string for classification
-	queryString := ""
+	// Stamp the request once on arrival; the log row and the SSE event share it.
+	receivedAt := time.Now().UTC()
+
+	// Only the head of the body is buffered for classification.
+	body := readBodyHead(r)
+
+	// Build raw request string for classification. The builder is sized
+	// exactly up front so large headers (cookies, JWTs) never force a regrow.
+	var sb strings.Builder
+	sb.Grow(rawRequestLen(r, path, len(body)))
+	sb.WriteString(r.Method)
+	sb.WriteByte(' ')
+	sb.WriteString(path)
 	if r.URL.RawQuery != "" {
-		queryString = "?" + r.URL.RawQuery
+		sb.WriteByte('?')
+		sb.WriteString(r.URL.RawQuery)
 	}
+	sb.WriteString(" HTTP/1.1")
 
-	body, _ := io.ReadAll(io.LimitReader(r.Body, 10<<20)) // 10 MB max
-
-	var rawLines []string
-	rawLines = append(rawLines, fmt.Sprintf("%s %s%s HTTP/1.1", r.Method, path, queryString))
+	// Single pass over the headers: finish the raw request for the
+	// classifiers and build the header set forwarded upstream.
+	fwdHeader := make(http.Header, len(r.Header)+4)
 	for key, values := range r.Header {
-		lk := strings.ToLower(key)
-		if lk == "host" || lk == "connection" || lk == "transfer-encoding" {
-			continue
+		if !classifyExcludedHeaders[key] {
+			for _, v := range values {
+				sb.WriteByte('\n')
+				sb.WriteString(key)
+				sb.WriteString(": ")
+				sb.WriteString(v)
+			}
 		}
-		for _, v := range values {
-			rawLines = append(rawLines, key+": "+v)
+		if !forwardStrippedHeaders[key] {
+			fwdHeader[key] = values
 		}
 	}
-	rawRequest := strings.Join(rawLines, "\n")
 	if len(body) > 0 {
-		rawRequest += "\n\n" + string(body)
+		sb.WriteString("\n\n")
+		sb.Write(body)
 	}
+	rawRequest := sb.String()
 
-	// Truncate for storage
-	rawForLog := rawRequest
-	if len(rawForLog) > 500 {
-		rawForLog = rawForLog[:500]
-	}
+	// Truncate for storage. The classifiers scan the body bytes as-is; the
+	// log writer makes the stored copy Postgres-safe text.
+	rawForLog := truncate(rawRequest, 500)
 
 	// Extract source IP
 	sourceIP := r.RemoteAddr
@@ -243,9 +307,9 @@ func (h *Handler) proxyRequest(w http.ResponseWriter, r *http.Request, site *db.
 	if blocked, reason := h.checkIPBlock(r.Context(), sourceIP); blocked {
 		w.Header().Set("Content-Type", "application/json")
 		w.WriteHeader(http.StatusForbidden)
-		json.NewEncoder(w).Encode(map[string]string{
-			"error":  "Blocked by Veil",
-			"reason": reason,
+		json.NewEncoder(w).Encode(blockedResponse{
+			Error:  "Blocked by Veil",
+			Reason: reason,
 		})
 		return
 	}
@@ -254,19 +318,25 @@ func (h *Handler) proxyRequest(w http.ResponseWriter, r *http.Request, site *db.
 	regexResult := classify.RegexClassify(rawRequest)
 
 	if regexResult.Classification == "MALICIOUS" && regexResult.Confidence > 0.6 {
-		// Regex caught a clear attack — block immediately, run LLM in background for logging
-		h.logAndBroadcast(site, rawForLog, rawRequest, sourceIP, regexResult, true)
-
-		// Fire off LLM classification in background for richer logging
-		go h.backgroundClassify(site, rawForLog, rawRequest, sourceIP)
+		// Regex caught a clear attack — block immediately. Logging, SSE publish
+		// and the LLM pass all happen in the background so the 403 isn't
+		// delayed by DB writes.
+		go h.logAndBroadcast(site, rawForLog, rawRequest, sourceIP, receivedAt, regexResult, true)
+
+		// Fire off LLM classification in background for richer logging. A
+		// verdict the pipeline would accept as final gets no LLM pass, so
+		// running it would only log the same row twice.
+		if classify.NeedsLLM(regexResult) {
+			go h.backgroundClassify(site, rawForLog, rawRequest, sourceIP, receivedAt, regexResult)
+		}
 
 		w.Header().Set("Content-Type", "application/json")
 		w.WriteHeader(http.StatusForbidden)
-		json.NewEncoder(w).Encode(map[string]any{
-			"error":          "Blocked by Veil",
-			"classification": regexResult.Classification,
-			"attack_type":    regexResult.AttackType,
-			"reason":         html.EscapeString(regexResult.Reason),
+		json.NewEncoder(w).Encode(blockedResponse{
+			Error:          "Blocked by Veil",
+			Classification: regexResult.Classification,
+			AttackType:     regexResult.AttackType,
+			Reason:         html.EscapeString(regexResult.Reason),
 		})
 		return
 	}
@@ -274,10 +344,10 @@ func (h *Handler) proxyRequest(w http.ResponseWriter, r *http.Request, site *db.
 	// Phase 2: Proxy immediately. For safe requests, log directly. For suspicious, run LLM in background.
 	if regexResult.Classification == "SAFE" {
 		// Regex says safe — log it and move on, no LLM needed
-		go h.logAndBroadcast(site, rawForLog, rawRequest, sourceIP, regexResult, false)
+		go h.logAndBroadcast(site, rawForLog, rawRequest, sourceIP, receivedAt, regexResult, false)
 	} else {
 		// Suspicious or low-confidence malicious — run full LLM pipeline in background
-		go h.backgroundClassify(site, rawForLog, rawRequest, sourceIP)
+		go h.backgroundClassify(site, rawForLog, rawRequest, sourceIP, receivedAt, regexResult)
 	}
 
 	// Forward to upstream — strip any CIDR suffix (e.g. /32 from inet conversion)
@@ -303,26 +373,22 @@ func (h *Handler) proxyRequest(w http.ResponseWriter, r *http.Request, site *db.
 		forwardURL += "?" + r.URL.RawQuery
 	}
 
-	proxyReq, err := http.NewRequestWithContext(r.Context(), r.Method, forwardURL, strings.NewReader(string(body)))
+	// Forward the buffered head followed by the unread remainder of the body.
+	var upstreamBody io.Reader = http.NoBody
+	if len(body) > 0 {
+		upstreamBody = io.MultiReader(bytes.NewReader(body), io.LimitReader(r.Body, maxBodyBytes-int64(len(body))))
+	}
+	proxyReq, err := http.NewRequestWithContext(r.Context(), r.Method, forwardURL, upstreamBody)
 	if err != nil {
 		jsonError(w, "Failed to create upstream request", http.StatusBadGateway)
 		return
 	}
-
-	// Copy headers — strip hop-by-hop and spoofable forwarded headers
-	strippedHeaders := map[string]bool{
-		"host": true, "connection": true, "transfer-encoding": true,
-		"content-length": true, "x-forwarded-host": true, "x-forwarded-proto": true,
-		"x-forwarded-for": true, "x-real-ip": true, "via": true,
-	}
-	for key, values := range r.Header {
-		if strippedHeaders[strings.ToLower(key)] {
-			continue
-		}
-		for _, v := range values {
-			proxyReq.Header.Add(key, v)
-		}
+	if len(body) > 0 && r.ContentLength > 0 && r.ContentLength <= maxBodyBytes {
+		proxyReq.ContentLength = r.ContentLength
 	}
+
+	// Headers were filtered above — hop-by-hop and spoofable forwarded headers stripped
+	proxyReq.Header = fwdHeader
 	// Set trusted forwarded headers from our own knowledge
 	proxyReq.Header.Set("Host", site.Domain)
 	proxyReq.Header.Set("X-Forwarded-For", sourceIP)
@@ -343,14 +409,8 @@ func (h *Handler) proxyRequest(w http.ResponseWriter, r *http.Request, site *db.
 	defer resp.Body.Close()
 
 	// Copy response headers
-	excludedHeaders := map[string]bool{
-		"transfer-encoding": true,
-		"connection":        true,
-		"content-encoding":  true,
-		"content-length":    true,
-	}
 	for key, values := range resp.Header {
-		if excludedHeaders[strings.ToLower(key)] {
+		if responseExcludedHeaders[key] {
 			continue
 		}
 		for _, v := range values {
@@ -359,7 +419,84 @@ func (h *Handler) proxyRequest(w http.ResponseWriter, r *http.Request, site *db.
 	}
 
 	w.WriteHeader(resp.StatusCode)
-	io.Copy(w, resp.Body)
+	if resp.ContentLength >= 0 {
+		io.Copy(w, resp.Body)
+		return
+	}
+	// Unknown length (chunked, SSE, long-poll): flush each chunk through as
+	// it arrives instead of waiting for the response buffer to fill.
+	flushCopy(w, resp.Body)
+}
+
+// copyBufPool recycles flushCopy's chunk buffers, so a streaming response
+// holds one pooled 32 KiB buffer instead of allocating a fresh one each time.
+var copyBufPool = sync.Pool{
+	New: func() any {
+		b := make([]byte, 32<<10)
+		return &b
+	},
+}
+
+// flushCopy streams src to w, flushing after every read so the client sees
+// bytes at the upstream's pace.
+func flushCopy(w http.ResponseWriter, src io.Reader) {
+	rc := http.NewResponseController(w)
+	bp := copyBufPool.Get().(*[]byte)
+	defer copyBufPool.Put(bp)
+	buf := *bp
+	for {
+		n, err := src.Read(buf)
+		if n > 0 {
+			if _, werr := w.Write(buf[:n]); werr != nil {
+				return
+			}
+			if rc.Flush() != nil {
+				// Writer can't flush; fall back to a plain copy of the rest.
+				io.Copy(w, src)
+				return
+			}
+		}
+		if err != nil {
+			return
+		}
+	}
+}
+
+// rawRequestLen returns the exact length of the raw request text built in
+// proxyRequest for the classifiers.
+func rawRequestLen(r *http.Request, path string, bodyLen int) int {
+	n := len(r.Method) + 1 + len(path) + len(" HTTP/1.1")
+	if r.URL.RawQuery != "" {
+		n += 1 + len(r.URL.RawQuery)
+	}
+	for key, values := range r.Header {
+		if classifyExcludedHeaders[key] {
+			continue
+		}
+		for _, v := range values {
+			n += 1 + len(key) + 2 + len(v)
+		}
+	}
+	if bodyLen > 0 {
+		n += 2 + bodyLen
+	}
+	return n
+}
+
+// readBodyHead reads up to classifyBodyBytes of the request body into a single
+// exactly-sized buffer (io.ReadAll would grow through several reallocations).
+// Bodyless requests allocate nothing.
+func readBodyHead(r *http.Request) []byte {
+	if r.Body == nil || r.ContentLength == 0 {
+		return nil
+	}
+	n := int64(classifyBodyBytes)
+	if r.ContentLength > 0 && r.ContentLength < n {
+		n = r.ContentLength
+	}
+	buf := make([]byte, n)
+	read, _ := io.ReadFull(r.Body, buf)
+	return buf[:read]
 }
 
 // checkIPBlock checks the source IP against the threat_ips feed and active
@@ -394,21 +531,22 @@ func (h *Handler) checkIPBlock(ctx context.Context, ip string) (bool, string) {
 
 // backgroundClassify runs the full LLM classification pipeline in a background goroutine.
 // It logs the result to DB and broadcasts via SSE.
-func (h *Handler) backgroundClassify(site *db.Site, rawForLog, rawRequest, sourceIP string) {
+func (h *Handler) backgroundClassify(site *db.Site, rawForLog, rawRequest, sourceIP string, receivedAt time.Time, regexResult *classify.Result) {
 	ctx, cancel := context.WithTimeout(context.Background(), 30*time.Second)
 	defer cancel()
 
-	result := h.pipeline.Classify(ctx, site.ID, rawRequest)
-	h.logAndBroadcast(site, rawForLog, rawRequest, sourceIP, result, result.Blocked)
+	result := h.pipeline.ClassifyScreened(ctx, site.ID, rawRequest, regexResult)
+	h.logAndBroadcast(site, rawForLog, rawRequest, sourceIP, receivedAt, result, result.Blocked)
 }
 
-// logAndBroadcast writes a request log entry and publishes an SSE event.
-func (h *Handler) logAndBroadcast(site *db.Site, rawForLog, rawRequest, sourceIP string, result *classify.Result, blocked bool) {
+// logAndBroadcast queues a request log entry and publishes an SSE event.
+func (h *Handler) logAndBroadcast(site *db.Site, rawForLog, rawRequest, sourceIP string, receivedAt time.Time, result *classify.Result, blocked bool) {
 	ctx, cancel := context.WithTimeout(context.Background(), 5*time.Second)
 	defer cancel()
 
 	logEntry := &db.RequestLogEntry{
 		SiteID:         site.ID,
+		Timestamp:      receivedAt,
 		RawRequest:     rawForLog,
 		Classification: result.Classification,
 		Confidence:     float32(result.Confidence),
@@ -418,40 +556,80 @@ func (h *Handler) logAndBroadcast(site *db.Site, rawForLog, rawRequest, sourceIP
 		ResponseTimeMs: float32(result.ResponseTimeMs),
 		SourceIP:       sourceIP,
 	}
-	if err := h.db.InsertRequestLog(ctx, logEntry); err != nil {
-		h.logger.Error("failed to log request", "err", err)
+	if !h.logs.Enqueue(logEntry) {
+		// Queue full: fall back to a direct insert rather than drop the row.
+		if err := h.db.InsertRequestLog(ctx, logEntry); err != nil {
+			h.logger.Error("failed to log request", "err", err)
+		}
 	}
 
-	// Auto-populate threat_ips for blocked malicious requests
-	if blocked && sourceIP != "" && net.ParseIP(sourceIP) != nil {
+	// Auto-populate threat_ips for blocked malicious requests. X-Real-IP is
+	// client-supplied, so only real IPs are recorded.
+	if blocked && net.ParseIP(sourceIP) != nil {
 		tier := "scrutinize" // default: flag for deeper analysis
-		_ = h.db.InsertSingleThreatIP(ctx, sourceIP, tier, "waf-live")
-	}
-
-	if h.hub != nil {
-		eventData, _ := json.Marshal(map[string]any{
-			"type":           "request",
-			"timestamp":      time.Now().UTC().Format(time.RFC3339),
-			"message":        truncate(rawRequest, 120),
-			"classification": result.Classification,
-			"confidence":     result.Confidence,
-			"blocked":        blocked,
-			"classifier":     result.Classifier,
-			"attack_type":    result.AttackType,
-			"source_ip":      sourceIP,
+		if !h.logs.EnqueueThreatIP(sourceIP, tier, "waf-live") {
+			_ = h.db.InsertSingleThreatIP(ctx, sourceIP, tier, "waf-live")
+		}
+	}
+
+	// Events are serialized once per request and shared by every subscriber;
+	// when nobody is watching this site, skip building them at all.
+	if siteKey := strconv.Itoa(site.ID); h.hub != nil && h.hub.SubscriberCount(siteKey) > 0 {
+		eventData, _ := json.Marshal(requestEvent{
+			Type:           "request",
+			Timestamp:      receivedAt.Format(time.RFC3339),
+			Message:        truncate(rawRequest, 120),
+			Classification: result.Classification,
+			Confidence:     result.Confidence,
+			Blocked:        blocked,
+			Classifier:     result.Classifier,
+			AttackType:     result.AttackType,
+			SourceIP:       sourceIP,
 		})
-		h.hub.Publish(strconv.Itoa(site.ID), sse.Event{Type: "request", Data: eventData})
+		h.hub.Publish(siteKey, sse.Event{Type: "request", Data: eventData})
 
 		// Broadcast incremental stats update so dashboards update in real-time
-		statsData, _ := json.Marshal(map[string]any{
-			"type":        "stats_increment",
-			"blocked":     blocked,
-			"attack_type": result.AttackType,
+		statsData, _ := json.Marshal(statsIncrementEvent{
+			Type:       "stats_increment",
+			Blocked:    blocked,
+			AttackType: result.AttackType,
 		})
-		h.hub.Publish(strconv.Itoa(site.ID), sse.Event{Type: "stats_increment", Data: statsData})
+		h.hub.Publish(siteKey, sse.Event{Type: "stats_increment", Data: statsData})
 	}
 }
 
+// blockedResponse is the 403 body returned for a blocked request. Under an
+// attack it is written for most traffic, so it is a typed struct rather than
+// a map like the rarer error responses.
+type blockedResponse struct {
+	Error          string `json:"error"`
+	Classification string `json:"classification,omitempty"`
+	AttackType     string `json:"attack_type,omitempty"`
+	Reason         string `json:"reason"`
+}
+
+// requestEvent is the SSE payload for a classified request. A typed struct
+// encodes considerably faster than map[string]any (no per-call map
+// allocation or key sorting) on this per-request path.
+type requestEvent struct {
+	Type           string  `json:"type"`
+	Timestamp      string  `json:"timestamp"`
+	Message        string  `json:"message"`
+	Classification string  `json:"classification"`
+	Confidence     float64 `json:"confidence"`
+	Blocked        bool    `json:"blocked"`
+	Classifier     string  `json:"classifier"`
+	AttackType     string  `json:"attack_type"`
+	SourceIP       string  `json:"source_ip"`
+}
+
+// statsIncrementEvent is the SSE payload for a live stats bump.
+type statsIncrementEvent struct {
+	Type       string `json:"type"`
+	Blocked    bool   `json:"blocked"`
+	AttackType string `json:"attack_type"`
+}
+
 func truncate(s string, maxLen int) string {
 	if len(s) <= maxLen {
 		return s
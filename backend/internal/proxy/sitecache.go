@@ -0,0 +1,52 @@
+package proxy
+
+import (
+	"sync"
+	"time"
+
+	"github.com/veil-waf/veil-go/internal/db"
+)
+
+// siteCacheTTL bounds how long a domain→site mapping is served from memory.
+// Site edits and deletions propagate within this window.
+const siteCacheTTL = 10 * time.Second
+
+type siteCacheEntry struct {
+	site    *db.Site
+	expires time.Time
+}
+
+// siteCache memoizes GetSiteByDomain for host-routed traffic, which is the
+// router's catch-all and would otherwise cost a DB round trip on every request.
+// Only hits are cached, so newly added domains are routable immediately.
+type siteCache struct {
+	mu      sync.RWMutex
+	entries map[string]siteCacheEntry
+}
+
+func newSiteCache() *siteCache {
+	return &siteCache{entries: make(map[string]siteCacheEntry)}
+}
+
+func (c *siteCache) get(domain string) *db.Site {
+	c.mu.RLock()
+	e, ok := c.entries[domain]
+	c.mu.RUnlock()
+	if !ok || time.Now().After(e.expires) {
+		return nil
+	}
+	return e.site
+}
+
+func (c *siteCache) put(domain string, site *db.Site) {
+	now := time.Now()
+	c.mu.Lock()
+	// Sweep expired entries opportunistically; the set of domains is small.
+	for k, e := range c.entries {
+		if now.After(e.expires) {
+			delete(c.entries, k)
+		}
+	}
+	c.entries[domain] = siteCacheEntry{site: site, expires: now.Add(siteCacheTTL)}
+	c.mu.Unlock()
+}
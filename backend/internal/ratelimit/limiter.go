@@ -1,62 +1,168 @@
 package ratelimit
 
 import (
+	"context"
 	"net/http"
 	"sync"
 	"time"
 )
 
-// Bucket defines rate limit parameters.
+// Bucket defines rate limit parameters. Strict buckets admit at most
+// MaxRequests in any Window (a sliding-window log); the others are token
+// buckets that may burst to MaxRequests on top of the refill.
 type Bucket struct {
 	MaxRequests int
 	Window      time.Duration
+	Strict      bool
 }
 
 // DefaultBuckets are the rate limits matching the Python backend.
 var DefaultBuckets = map[string]Bucket{
 	"classify": {MaxRequests: 30, Window: time.Minute},
 	"proxy":    {MaxRequests: 60, Window: time.Minute},
-	"auth":     {MaxRequests: 10, Window: time.Minute},
+	"auth":     {MaxRequests: 10, Window: time.Minute, Strict: true},
 	"api":      {MaxRequests: 60, Window: time.Minute},
-	"agents":   {MaxRequests: 3, Window: 5 * time.Minute},
+	"agents":   {MaxRequests: 3, Window: 5 * time.Minute, Strict: true},
 }
 
-// Limiter is an in-memory sliding-window rate limiter per key.
+// limiterShards is the number of independently locked partitions of the key
+// space, so concurrent requests from different clients rarely contend.
+const limiterShards = 32
+
+// Limiter is an in-memory rate limiter per key. Token buckets hold up to
+// MaxRequests tokens and refill at MaxRequests per Window, so a client can
+// burst to the limit and then sustains the configured average rate. Strict
+// buckets keep the last MaxRequests admission times instead.
 type Limiter struct {
-	mu   sync.Mutex
-	hits map[string][]time.Time
+	shards [limiterShards]shard
+}
+
+type shard struct {
+	mu      sync.Mutex
+	buckets map[string]*tokenBucket
+}
+
+// tokenBucket is the per-key state: constant size regardless of request rate.
+type tokenBucket struct {
+	tokens float64
+	last   int64 // unix nanos of the last update
+	full   int64 // unix nanos at which the bucket is back to full
+
+	// Strict buckets only: ring of the last MaxRequests admission times,
+	// with next pointing at the oldest.
+	stamps []int64
+	next   int
 }
 
 // New creates a new rate limiter.
 func New() *Limiter {
-	return &Limiter{hits: make(map[string][]time.Time)}
+	l := &Limiter{}
+	for i := range l.shards {
+		l.shards[i].buckets = make(map[string]*tokenBucket)
+	}
+	return l
+}
+
+// shardFor picks the shard for key (FNV-1a, inlined to avoid allocating a hasher).
+func (l *Limiter) shardFor(key string) *shard {
+	h := uint32(2166136261)
+	for i := 0; i < len(key); i++ {
+		h ^= uint32(key[i])
+		h *= 16777619
+	}
+	return &l.shards[h%limiterShards]
 }
 
 // Allow checks if a request identified by key is within the rate limit for the
 // given bucket. Returns true if allowed.
 func (l *Limiter) Allow(key string, bucket Bucket) bool {
-	l.mu.Lock()
-	defer l.mu.Unlock()
-
-	now := time.Now()
-	cutoff := now.Add(-bucket.Window)
-
-	// Prune old entries
-	times := l.hits[key]
-	pruned := times[:0]
-	for _, t := range times {
-		if t.After(cutoff) {
-			pruned = append(pruned, t)
-		}
+	allowed, _ := l.reserve(key, bucket)
+	return allowed
+}
+
+// reserve is Allow that also reports, for a rejected request, how long until
+// the next one would be admitted.
+func (l *Limiter) reserve(key string, bucket Bucket) (bool, time.Duration) {
+	now := time.Now().UnixNano()
+
+	sh := l.shardFor(key)
+	sh.mu.Lock()
+	defer sh.mu.Unlock()
+
+	if bucket.Strict {
+		return sh.slidingWindow(key, bucket, now)
 	}
 
-	if len(pruned) >= bucket.MaxRequests {
-		l.hits[key] = pruned
-		return false
+	burst := float64(bucket.MaxRequests)
+	rate := burst / float64(bucket.Window) // tokens per nanosecond
+
+	b := sh.buckets[key]
+	if b == nil {
+		b = &tokenBucket{tokens: burst, last: now}
+		sh.buckets[key] = b
 	}
+	b.tokens = min(burst, b.tokens+float64(now-b.last)*rate)
+	b.last = now
 
-	l.hits[key] = append(pruned, now)
-	return true
+	allowed := b.tokens >= 1
+	if allowed {
+		b.tokens--
+	}
+	b.full = now + int64((burst-b.tokens)/rate)
+	if allowed {
+		return true, 0
+	}
+	return false, time.Duration((1 - b.tokens) / rate)
+}
+
+// slidingWindow admits a request if the oldest of the last MaxRequests
+// admissions is at least Window old. Caller holds sh.mu.
+func (sh *shard) slidingWindow(key string, bucket Bucket, now int64) (bool, time.Duration) {
+	window := int64(bucket.Window)
+	b := sh.buckets[key]
+	if b == nil || len(b.stamps) != bucket.MaxRequests {
+		b = &tokenBucket{stamps: make([]int64, bucket.MaxRequests)}
+		sh.buckets[key] = b
+	}
+	if len(b.stamps) == 0 {
+		return false, bucket.Window
+	}
+
+	oldest := b.stamps[b.next]
+	if oldest != 0 && now-oldest < window {
+		return false, time.Duration(oldest + window - now)
+	}
+	b.stamps[b.next] = now
+	b.next = (b.next + 1) % len(b.stamps)
+	b.full = now + window
+	return true, 0
+}
+
+// CleanupLoop periodically removes keys whose buckets have refilled (or whose
+// admissions have all left the window), so the map doesn't grow without bound
+// as client IPs churn. A full bucket is indistinguishable from a missing one.
+func (l *Limiter) CleanupLoop(ctx context.Context) {
+	ticker := time.NewTicker(time.Minute)
+	defer ticker.Stop()
+	for {
+		select {
+		case <-ctx.Done():
+			return
+		case now := <-ticker.C:
+			// One shard at a time, so the sweep never stalls all traffic.
+			nowNano := now.UnixNano()
+			for i := range l.shards {
+				sh := &l.shards[i]
+				sh.mu.Lock()
+				for key, b := range sh.buckets {
+					if nowNano >= b.full {
+						delete(sh.buckets, key)
+					}
+				}
+				sh.mu.Unlock()
+			}
+		}
+	}
 }
 
 // Check returns an http.StatusTooManyRequests error response if the IP is rate
@@ -73,14 +179,17 @@ func (l *Limiter) Check(w http.ResponseWriter, r *http.Request, bucketName strin
 	}
 	key := bucketName + ":" + ip
 
-	if l.Allow(key, bucket) {
+	allowed, wait := l.reserve(key, bucket)
+	if allowed {
 		return false
 	}
 
-	w.Header().Set("Retry-After", itoa(int(bucket.Window.Seconds())))
+	// Whole seconds, rounded up, so a client retrying on time is admitted.
+	retryAfter := itoa(max(1, int((wait+time.Second-1)/time.Second)))
+	w.Header().Set("Retry-After", retryAfter)
 	w.Header().Set("Content-Type", "application/json")
 	w.WriteHeader(http.StatusTooManyRequests)
-	w.Write([]byte(`{"error":"Rate limited","retry_after_seconds":` + itoa(int(bucket.Window.Seconds())) + `}`))
+	w.Write([]byte(`{"error":"Rate limited","retry_after_seconds":` + retryAfter + `}`))
 	return true
 }
 
@@ -6,17 +6,18 @@ import (
 	"encoding/json"
 	"fmt"
 	"log/slog"
+	"net/http"
 	"os"
 	"path/filepath"
 	"strings"
 	"time"
 
 	"github.com/anthropics/anthropic-sdk-go"
-	"github.com/anthropics/anthropic-sdk-go/bedrock"
 	"github.com/google/go-github/v69/github"
 	"golang.org/x/oauth2"
 
 	"github.com/veil-waf/veil-go/internal/auth"
+	"github.com/veil-waf/veil-go/internal/classify"
 	"github.com/veil-waf/veil-go/internal/db"
 )
 
@@ -31,6 +32,21 @@ func NewScanner(database *db.DB, enc *auth.TokenEncryptor, logger *slog.Logger)
 	return &Scanner{db: database, encryptor: enc, logger: logger}
 }
 
+// githubAPIClient supplies the pooled transport under every per-user GitHub
+// client, so scans reuse keep-alive connections to api.github.com instead of
+// each getClient call dialling and handshaking afresh (the default transport
+// keeps only two idle connections per host).
+var githubAPIClient = &http.Client{
+	Transport: &http.Transport{
+		Proxy:               http.ProxyFromEnvironment,
+		ForceAttemptHTTP2:   true,
+		MaxIdleConns:        32,
+		MaxIdleConnsPerHost: 16,
+		IdleConnTimeout:     90 * time.Second,
+		TLSHandshakeTimeout: 10 * time.Second,
+	},
+}
+
 // getClient creates an authenticated GitHub client for a user.
 func (s *Scanner) getClient(ctx context.Context, userID int) (*github.Client, error) {
 	encToken, err := s.db.GetGitHubToken(ctx, userID)
@@ -42,6 +58,7 @@ func (s *Scanner) getClient(ctx context.Context, userID int) (*github.Client, er
 		return nil, fmt.Errorf("decrypt token: %w", err)
 	}
 	ts := oauth2.StaticTokenSource(&oauth2.Token{AccessToken: token})
+	ctx = context.WithValue(ctx, oauth2.HTTPClient, githubAPIClient)
 	return github.NewClient(oauth2.NewClient(ctx, ts)), nil
 }
 
@@ -285,16 +302,12 @@ For each vulnerability found, respond with a JSON array:
 Only report real vulnerabilities that match the detected attack type. If no vulnerable code is found, return an empty array [].
 Respond ONLY with the JSON array, no other text.`, attackType, payload, reason, fileBlock.String(), attackType)
 
-	region := os.Getenv("AWS_REGION")
-	if region == "" {
-		region = "eu-west-1"
-	}
 	model := os.Getenv("BEDROCK_MODEL")
 	if model == "" {
 		model = "global.anthropic.claude-sonnet-4-5-20250929-v1:0"
 	}
 
-	client := anthropic.NewClient(bedrock.WithLoadDefaultConfig(ctx))
+	client := classify.BedrockClient()
 
 	message, err := client.Messages.New(ctx, anthropic.MessageNewParams{
 		Model:     anthropic.Model(model),
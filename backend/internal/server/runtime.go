@@ -0,0 +1,96 @@
+package server
+
+import (
+	"log/slog"
+	"math"
+	"os"
+	"runtime"
+	"runtime/debug"
+	"strconv"
+	"strings"
+)
+
+const (
+	// cgroupCPUMax is the cgroup v2 CPU quota file ("<quota> <period>" or "max <period>").
+	cgroupCPUMax = "/sys/fs/cgroup/cpu.max"
+	// cgroupMemoryMax is the cgroup v2 memory limit in bytes (or "max").
+	cgroupMemoryMax = "/sys/fs/cgroup/memory.max"
+	// memLimitFraction leaves headroom below the container limit for non-heap memory.
+	memLimitFraction = 0.9
+)
+
+// TuneRuntime sizes the Go runtime to the container it runs in: GOMAXPROCS to
+// the CPU quota and the GC soft memory limit to the memory limit. Explicit
+// GOMAXPROCS / GOMEMLIMIT env vars always win.
+func TuneRuntime(logger *slog.Logger) {
+	tuneMaxProcs(logger)
+	tuneMemoryLimit(logger)
+}
+
+// tuneMaxProcs sizes GOMAXPROCS to the container CPU quota. Go 1.24 defaults
+// GOMAXPROCS to the host CPU count, so a container limited to 2 CPUs on a
+// 32-core host runs 32 Ps and gets throttled by CFS under load.
+func tuneMaxProcs(logger *slog.Logger) {
+	if v := os.Getenv("GOMAXPROCS"); v != "" {
+		logger.Info("runtime configured", "gomaxprocs", runtime.GOMAXPROCS(0), "source", "env")
+		return
+	}
+
+	if quota, ok := cgroupCPUQuota(); ok {
+		procs := int(math.Ceil(quota))
+		if procs < 1 {
+			procs = 1
+		}
+		if procs < runtime.NumCPU() {
+			runtime.GOMAXPROCS(procs)
+			logger.Info("runtime configured", "gomaxprocs", procs, "source", "cgroup", "cpu_quota", quota)
+			return
+		}
+	}
+
+	logger.Info("runtime configured", "gomaxprocs", runtime.GOMAXPROCS(0), "source", "default")
+}
+
+// tuneMemoryLimit sets a GC soft memory limit just under the container memory
+// limit. With only GOGC the heap can grow to twice the live set between
+// cycles; the limit makes the GC work harder near the ceiling instead of
+// letting the container get OOM-killed, and lets GOGC stay at its default
+// (cheap) setting the rest of the time.
+func tuneMemoryLimit(logger *slog.Logger) {
+	if os.Getenv("GOMEMLIMIT") != "" {
+		return
+	}
+	data, err := os.ReadFile(cgroupMemoryMax)
+	if err != nil {
+		return
+	}
+	limit, err := strconv.ParseInt(strings.TrimSpace(string(data)), 10, 64)
+	if err != nil || limit <= 0 {
+		return // "max" — no limit
+	}
+	soft := int64(float64(limit) * memLimitFraction)
+	debug.SetMemoryLimit(soft)
+	logger.Info("runtime memory limit configured", "gomemlimit", soft, "cgroup_limit", limit)
+}
+
+// cgroupCPUQuota returns the CPU limit in cores from the cgroup v2 cpu.max
+// file, or false if there is no limit or the file is unavailable.
+func cgroupCPUQuota() (float64, bool) {
+	data, err := os.ReadFile(cgroupCPUMax)
+	if err != nil {
+		return 0, false
+	}
+	fields := strings.Fields(string(data))
+	if len(fields) != 2 || fields[0] == "max" {
+		return 0, false
+	}
+	quota, err := strconv.ParseFloat(fields[0], 64)
+	if err != nil || quota <= 0 {
+		return 0, false
+	}
+	period, err := strconv.ParseFloat(fields[1], 64)
+	if err != nil || period <= 0 {
+		return 0, false
+	}
+	return quota / period, true
+}
@@ -52,19 +52,46 @@ func (h *Hub) Subscribe(siteID string) (chan Event, func()) {
 }
 
 // Publish sends an event to all subscribers of the given site ID.
-// If a subscriber's channel is full, the event is dropped and a warning is logged.
+// If a subscriber's channel is full, its oldest queued event is dropped to
+// make room (a dashboard wants the latest state, not a stale backlog) and a
+// warning is logged.
+//
+// Sends never block, so the fan-out runs under the read lock: a slow client
+// costs nothing to the others, and a concurrent Subscribe/cancel can neither
+// mutate the set mid-iteration nor close a channel we are sending on.
 func (h *Hub) Publish(siteID string, event Event) {
+	dropped := 0
 	h.mu.RLock()
-	subs := h.subscribers[siteID]
+	for ch := range h.subscribers[siteID] {
+		if !offer(ch, event) {
+			dropped++
+		}
+	}
 	h.mu.RUnlock()
 
-	for ch := range subs {
-		select {
-		case ch <- event:
-		default:
-			h.logger.Warn("sse: dropped event for slow client", "site_id", siteID)
-		}
+	if dropped > 0 {
+		h.logger.Warn("sse: dropped event for slow clients", "site_id", siteID, "clients", dropped)
+	}
+}
+
+// offer queues event on ch without blocking, evicting the oldest queued event
+// if ch is full. It reports false if an event had to be dropped.
+func offer(ch chan Event, event Event) bool {
+	select {
+	case ch <- event:
+		return true
+	default:
+	}
+	select {
+	case <-ch:
+	default:
+	}
+	select {
+	case ch <- event:
+	default:
+		// Lost a race with another publisher; drop this event instead.
 	}
+	return false
 }
 
 // SubscriberCount returns the number of active subscribers for the given site ID.
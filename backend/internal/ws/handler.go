@@ -1,6 +1,7 @@
 package ws
 
 import (
+	"context"
 	"encoding/json"
 	"log/slog"
 	"net/http"
@@ -31,17 +32,130 @@ var upgrader = websocket.Upgrader{
 	},
 }
 
+const (
+	// sendQueueSize bounds each client's outbound queue. When a client falls
+	// behind, the oldest queued frame is dropped rather than blocking broadcasts.
+	sendQueueSize = 64
+	writeWait     = 5 * time.Second
+	// pongWait is how long a client may go without answering a ping before
+	// it is treated as gone; pings go out often enough to fit inside it.
+	pongWait   = 60 * time.Second
+	pingPeriod = pongWait * 9 / 10
+)
+
+// client is a single WebSocket connection with its own outbound queue,
+// drained by a dedicated writer goroutine so one slow client cannot stall
+// broadcasts to the others.
+type client struct {
+	conn *websocket.Conn
+	send chan *message
+	done chan struct{}
+}
+
+// message is one serialized event. The prepared frame is used when it goes
+// out alone; the raw JSON when it is coalesced into a batch.
+type message struct {
+	data     []byte
+	prepared *websocket.PreparedMessage
+}
+
+// enqueue queues msg for sending, dropping the oldest queued frame if full.
+func (c *client) enqueue(msg *message) {
+	for {
+		select {
+		case c.send <- msg:
+			return
+		default:
+		}
+		select {
+		case <-c.send:
+		default:
+		}
+	}
+}
+
+// writePump is the only goroutine that writes to the connection. Whatever
+// has queued up behind the first message (hydration, bursts of agent
+// updates) goes out as a single {"type":"batch","events":[...]} frame
+// instead of one frame per event. It also pings the client every
+// pingPeriod so half-open connections are noticed and pruned even when
+// nothing is being broadcast.
+func (c *client) writePump() {
+	ping := time.NewTicker(pingPeriod)
+	defer ping.Stop()
+
+	var batch []*message
+	for {
+		select {
+		case msg := <-c.send:
+			batch = append(batch[:0], msg)
+		drain:
+			for len(batch) < sendQueueSize {
+				select {
+				case m := <-c.send:
+					batch = append(batch, m)
+				default:
+					break drain
+				}
+			}
+
+			c.conn.SetWriteDeadline(time.Now().Add(writeWait))
+			var err error
+			if len(batch) == 1 {
+				err = c.conn.WritePreparedMessage(batch[0].prepared)
+			} else {
+				err = c.conn.WriteMessage(websocket.TextMessage, batchFrame(batch))
+			}
+			if err != nil {
+				// Closing the conn unblocks the read loop, which unregisters us.
+				c.conn.Close()
+				return
+			}
+		case <-ping.C:
+			c.conn.SetWriteDeadline(time.Now().Add(writeWait))
+			if err := c.conn.WriteMessage(websocket.PingMessage, nil); err != nil {
+				c.conn.Close()
+				return
+			}
+		case <-c.done:
+			return
+		}
+	}
+}
+
+// batchFrame splices already-serialized events into one batch envelope.
+func batchFrame(batch []*message) []byte {
+	const head, tail = `{"type":"batch","events":[`, `]}`
+	n := len(head) + len(tail) + len(batch) - 1
+	for _, m := range batch {
+		n += len(m.data)
+	}
+	b := make([]byte, 0, n)
+	b = append(b, head...)
+	for i, m := range batch {
+		if i > 0 {
+			b = append(b, ',')
+		}
+		b = append(b, m.data...)
+	}
+	return append(b, tail...)
+}
+
 // Manager tracks active WebSocket connections and broadcasts events.
 type Manager struct {
 	mu          sync.RWMutex
-	connections []*websocket.Conn
+	connections map[*client]struct{}
 	logger      *slog.Logger
 	db          *db.DB
 }
 
 // NewManager creates a new WebSocket manager.
 func NewManager(database *db.DB, logger *slog.Logger) *Manager {
-	return &Manager{db: database, logger: logger}
+	return &Manager{
+		db:          database,
+		logger:      logger,
+		connections: make(map[*client]struct{}),
+	}
 }
 
 // HandleWS upgrades an HTTP connection to WebSocket and registers it.
@@ -52,23 +166,31 @@ func (m *Manager) HandleWS(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
+	c := &client{
+		conn: conn,
+		send: make(chan *message, sendQueueSize),
+		done: make(chan struct{}),
+	}
+	go c.writePump()
+
 	m.mu.Lock()
-	m.connections = append(m.connections, conn)
+	m.connections[c] = struct{}{}
 	m.mu.Unlock()
 
 	// Hydrate: send current stats and recent data
-	m.hydrate(conn)
+	m.hydrate(r.Context(), c)
 
-	// Keep connection alive, read messages (we ignore them)
+	// Keep connection alive, read messages (we ignore them). A client that
+	// stops answering pings hits the read deadline and is unregistered.
+	conn.SetReadDeadline(time.Now().Add(pongWait))
+	conn.SetPongHandler(func(string) error {
+		return conn.SetReadDeadline(time.Now().Add(pongWait))
+	})
 	defer func() {
 		m.mu.Lock()
-		for i, c := range m.connections {
-			if c == conn {
-				m.connections = append(m.connections[:i], m.connections[i+1:]...)
-				break
-			}
-		}
+		delete(m.connections, c)
 		m.mu.Unlock()
+		close(c.done)
 		conn.Close()
 	}()
 
@@ -79,33 +201,55 @@ func (m *Manager) HandleWS(w http.ResponseWriter, r *http.Request) {
 	}
 }
 
-func (m *Manager) hydrate(conn *websocket.Conn) {
-	ctx := conn.NetConn().LocalAddr().Network() // dummy context
-	_ = ctx
+// hydrate sends a new client the current stats and recent activity. The three
+// lookups run concurrently, and events are queued only once all of them are
+// back, in one burst that writePump coalesces into batch frames.
+func (m *Manager) hydrate(ctx context.Context, c *client) {
+	var (
+		wg       sync.WaitGroup
+		stats    *db.Stats
+		requests []db.RequestLogEntry
+		logs     []db.AgentLogEntry
+		statsErr error
+		reqErr   error
+		logsErr  error
+	)
+	wg.Add(3)
+	go func() {
+		defer wg.Done()
+		stats, statsErr = m.db.GetGlobalStats(ctx)
+	}()
+	go func() {
+		defer wg.Done()
+		requests, reqErr = m.db.GetGlobalRecentRequests(ctx, 20, 120)
+	}()
+	go func() {
+		defer wg.Done()
+		logs, logsErr = m.db.GetGlobalRecentAgentLogs(ctx, 10)
+	}()
+	wg.Wait()
 
 	// Send global stats
-	stats, err := m.db.GetGlobalStats(nil)
-	if err == nil {
-		m.sendJSON(conn, map[string]any{
-			"type":              "stats",
-			"total_requests":    stats.TotalRequests,
-			"blocked_requests":  stats.BlockedCount,
-			"total_threats":     stats.ThreatCount,
-			"threats_blocked":   stats.ThreatCount, // approximate
-			"block_rate":        blockRate(stats.TotalRequests, stats.BlockedCount),
-			"rules_version":     1,
+	if statsErr == nil {
+		m.sendJSON(c, map[string]any{
+			"type":             "stats",
+			"total_requests":   stats.TotalRequests,
+			"blocked_requests": stats.BlockedCount,
+			"total_threats":    stats.ThreatCount,
+			"threats_blocked":  stats.ThreatsBlocked,
+			"block_rate":       blockRate(stats.TotalRequests, stats.BlockedCount),
+			"rules_version":    stats.RulesVersion,
 		})
 	}
 
 	// Send recent requests
-	requests, err := m.db.GetGlobalRecentRequests(nil, 20)
-	if err == nil {
+	if reqErr == nil {
 		for i := len(requests) - 1; i >= 0; i-- {
 			r := requests[i]
-			m.sendJSON(conn, map[string]any{
+			m.sendJSON(c, map[string]any{
 				"type":           "request",
 				"timestamp":      r.Timestamp.Format(time.RFC3339),
-				"message":        truncate(r.RawRequest, 120),
+				"message":        r.RawRequest,
 				"classification": r.Classification,
 				"confidence":     r.Confidence,
 				"blocked":        r.Blocked,
@@ -116,15 +260,14 @@ func (m *Manager) hydrate(conn *websocket.Conn) {
 	}
 
 	// Send recent agent logs
-	logs, err := m.db.GetGlobalRecentAgentLogs(nil, 10)
-	if err == nil {
+	if logsErr == nil {
 		for i := len(logs) - 1; i >= 0; i-- {
 			l := logs[i]
 			status := "done"
 			if !l.Success {
 				status = "error"
 			}
-			m.sendJSON(conn, map[string]any{
+			m.sendJSON(c, map[string]any{
 				"type":   "agent",
 				"agent":  l.Agent,
 				"status": status,
@@ -134,42 +277,43 @@ func (m *Manager) hydrate(conn *websocket.Conn) {
 	}
 }
 
-// Broadcast sends a message to all connected WebSocket clients.
+// Broadcast queues a message for all connected WebSocket clients. The payload
+// is marshalled and framed once, shared by every client, and never blocks on a
+// slow client.
 func (m *Manager) Broadcast(data map[string]any) {
-	m.mu.RLock()
-	conns := make([]*websocket.Conn, len(m.connections))
-	copy(conns, m.connections)
-	m.mu.RUnlock()
-
-	var dead []*websocket.Conn
-	for _, conn := range conns {
-		if err := m.sendJSON(conn, data); err != nil {
-			dead = append(dead, conn)
-		}
+	msg, err := prepare(data)
+	if err != nil {
+		return
 	}
 
-	if len(dead) > 0 {
-		m.mu.Lock()
-		for _, d := range dead {
-			for i, c := range m.connections {
-				if c == d {
-					m.connections = append(m.connections[:i], m.connections[i+1:]...)
-					d.Close()
-					break
-				}
-			}
-		}
-		m.mu.Unlock()
+	m.mu.RLock()
+	for c := range m.connections {
+		c.enqueue(msg)
 	}
+	m.mu.RUnlock()
 }
 
-func (m *Manager) sendJSON(conn *websocket.Conn, data map[string]any) error {
-	msg, err := json.Marshal(data)
+func (m *Manager) sendJSON(c *client, data map[string]any) error {
+	msg, err := prepare(data)
 	if err != nil {
 		return err
 	}
-	conn.SetWriteDeadline(time.Now().Add(5 * time.Second))
-	return conn.WriteMessage(websocket.TextMessage, msg)
+	c.enqueue(msg)
+	return nil
+}
+
+// prepare serializes data into a text frame that can be written to any number
+// of connections without re-encoding or re-framing it per connection.
+func prepare(data map[string]any) (*message, error) {
+	b, err := json.Marshal(data)
+	if err != nil {
+		return nil, err
+	}
+	pm, err := websocket.NewPreparedMessage(websocket.TextMessage, b)
+	if err != nil {
+		return nil, err
+	}
+	return &message{data: b, prepared: pm}, nil
 }
 
 func blockRate(total, blocked int64) float64 {
@@ -178,10 +322,3 @@ func blockRate(total, blocked int64) float64 {
 	}
 	return float64(blocked) / float64(total) * 100
 }
-
-func truncate(s string, maxLen int) string {
-	if len(s) <= maxLen {
-		return s
-	}
-	return s[:maxLen]
-}
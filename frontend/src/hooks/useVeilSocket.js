@@ -22,9 +22,7 @@ export function useVeilSocket() {
       const ws = new WebSocket(url)
       wsRef.current = ws
 
-      ws.onmessage = (event) => {
-        const data = JSON.parse(event.data)
-
+      function handle(data) {
         if (data.type === 'request') {
           setRequests((prev) => [data, ...prev].slice(0, 200))
         } else if (data.type === 'agent') {
@@ -34,6 +32,17 @@ export function useVeilSocket() {
         }
       }
 
+      ws.onmessage = (event) => {
+        const data = JSON.parse(event.data)
+
+        // The server coalesces queued events into one batch frame.
+        if (data.type === 'batch') {
+          data.events.forEach(handle)
+        } else {
+          handle(data)
+        }
+      }
+
       ws.onclose = () => {
         setTimeout(connect, 2000)
       }